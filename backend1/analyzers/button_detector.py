@@ -1,57 +1,95 @@
 # backend/analyzers/button_detector.py
-import cv2
 import numpy as np
 
+from analyzers.context import AnalysisContext
+from analyzers.contrast import box_color_variance
+from analyzers.spatial import PointGrid, centers_in_rows, greedy_nms, owned_rows, to_box_array
+
 class ButtonDetector:
     def __init__(self):
         print("ButtonDetector initialized")
 
-    def detect_buttons(self, image, text_elements):
+    def detect_buttons(self, image, text_elements, context=None, candidates=None):
+        """Buttons from contour candidates and text; pass ``candidates`` if ``find_candidates`` already ran."""
         try:
-            buttons = []
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150, apertureSize=3)
-            kernel = np.ones((3,3), np.uint8)
-            edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                if 30 < w < 1000 and 10 < h < 400:
-                    aspect = w / (h + 1e-6)
-                    if 1.2 < aspect < 8:
-                        button_text = self._find_text_in_region(text_elements, x, y, w, h)
-                        roi = image[y:y+h, x:x+w]
-                        is_button_like = self._analyze_button_colors(roi)
-                        if button_text or is_button_like:
-                            buttons.append({
-                                "x": x, "y": y, "width": w, "height": h,
-                                "text": button_text or "",
-                                "type": self._classify_button_type(button_text or ""),
-                                "area": w * h
-                            })
-            # also detect small text-based potential buttons
-            buttons.extend(self._detect_text_buttons(text_elements))
-            buttons = self._remove_duplicate_buttons(buttons)
-            return buttons
+            if candidates is None:
+                candidates = self.find_candidates(context or AnalysisContext(image))
+            return self.buttons_from_candidates(candidates, text_elements)
         except Exception as e:
             print("Button detection error:", e)
             return []
 
-    def _find_text_in_region(self, text_elements, x, y, w, h):
-        found = []
-        for el in text_elements:
-            cx = el["x"] + el["width"] // 2
-            cy = el["y"] + el["height"] // 2
-            if x <= cx <= x + w and y <= cy <= y + h:
-                found.append(el["text"])
+    def detect_buttons_bands(self, image, bands, previous_candidates, text_elements, overlap, context=None):
+        """Re-run contour detection on row bands only, reusing ``previous_candidates`` elsewhere.
+
+        Uses the same ownership rule as ``TextExtractor.extract_text_bands``,
+        including dropping candidates centered below a shorter image.
+        Returns ``(buttons, candidates)`` so the merged candidates can be
+        reused again for the next revision.
+        """
+        try:
+            height = image.shape[0]
+            previous = np.asarray(previous_candidates, dtype=np.int64).reshape(-1, 5)
+            owned = owned_rows(bands, height, overlap)
+            stale = centers_in_rows(previous[:, 1], previous[:, 3], owned + [(height, np.iinfo(np.int64).max)])
+            kept = [previous[~stale]]
+            for (start, end), (own_start, own_end) in zip(bands, owned):
+                found = self.find_candidates(AnalysisContext(image[start:end]))
+                found[:, 1] += start
+                kept.append(found[centers_in_rows(found[:, 1], found[:, 3], [(own_start, own_end)])])
+            candidates = np.concatenate(kept)
+            return self.buttons_from_candidates(candidates, text_elements), candidates
+        except Exception as e:
+            print("Button detection error:", e)
+            return [], np.zeros((0, 5), dtype=np.int64)
+
+    def find_candidates(self, context):
+        """Button-sized contour boxes as an Nx5 int array: x, y, w, h and a flat-fill flag."""
+        # Canny(50, 150) + 3x3 close, shared through the context
+        _, rects = context.contours(50, 150, close=3)
+        w, h = rects[:, 2], rects[:, 3]
+        aspect = w / (h + 1e-6)
+        candidates = rects[(30 < w) & (w < 1000) & (10 < h) & (h < 400) & (1.2 < aspect) & (aspect < 8)]
+        # Color uniformity of every candidate in one summed-area-table pass
+        button_like = self._analyze_button_colors(context, candidates)
+        return np.column_stack([candidates, button_like]).astype(np.int64)
+
+    def buttons_from_candidates(self, candidates, text_elements):
+        """Label candidates with the text inside them, add text-only buttons and de-duplicate."""
+        buttons = []
+        text_index = self._build_text_index(text_elements)
+        for x, y, w, h, is_button_like in candidates.tolist():
+            button_text = self._find_text_in_region(text_elements, x, y, w, h, text_index)
+            if button_text or is_button_like:
+                buttons.append({
+                    "x": x, "y": y, "width": w, "height": h,
+                    "text": button_text or "",
+                    "type": self._classify_button_type(button_text or ""),
+                    "area": w * h
+                })
+        # also detect small text-based potential buttons
+        buttons.extend(self._detect_text_buttons(text_elements))
+        return self._remove_duplicate_buttons(buttons)
+
+    def _build_text_index(self, text_elements):
+        """Grid index over text element centers, built once per detection."""
+        boxes = to_box_array(text_elements)
+        return PointGrid(boxes["x"] + boxes["width"] // 2, boxes["y"] + boxes["height"] // 2)
+
+    def _find_text_in_region(self, text_elements, x, y, w, h, text_index=None):
+        if text_index is None:
+            text_index = self._build_text_index(text_elements)
+        # indices come back sorted, so words keep their reading order
+        found = [text_elements[i]["text"] for i in text_index.query(x, y, x + w, y + h)]
         return " ".join(found) if found else None
 
-    def _analyze_button_colors(self, roi):
-        if roi.size == 0 or roi.shape[0] < 4 or roi.shape[1] < 4:
-            return False
-        var = np.var(roi.reshape(-1, 3), axis=0)
-        avg_var = np.mean(var)
-        return avg_var < 2000
+    def _analyze_button_colors(self, context, rects):
+        """Flag boxes whose mean per-channel color variance is low (flat, button-like fill)."""
+        if len(rects) == 0:
+            return np.zeros(0, dtype=bool)
+        x0, y0, x1, y1, _ = context.clip_boxes(rects)
+        big_enough = ((x1 - x0) >= 4) & ((y1 - y0) >= 4)
+        return big_enough & (box_color_variance(context, rects) < 2000)
 
     def _classify_button_type(self, text):
         if not text:
@@ -81,15 +119,6 @@ class ButtonDetector:
         return buttons
 
     def _remove_duplicate_buttons(self, buttons):
-        unique = []
-        for b in buttons:
-            dup = False
-            for u in unique:
-                overlap_x = max(0, min(b["x"]+b["width"], u["x"]+u["width"]) - max(b["x"], u["x"]))
-                overlap_y = max(0, min(b["y"]+b["height"], u["y"]+u["height"]) - max(b["y"], u["y"]))
-                if overlap_x > 10 and overlap_y > 5:
-                    dup = True
-                    break
-            if not dup:
-                unique.append(b)
-        return unique
+        # first-come wins: drop a button overlapping (>10px wide, >5px tall) an earlier kept one
+        keep = greedy_nms(to_box_array(buttons), 10, 5)
+        return [b for b, k in zip(buttons, keep) if k]
@@ -0,0 +1,114 @@
+# backend/analyzers/context.py
+import time
+
+import cv2
+import numpy as np
+
+from analyzers.contrast import relative_luminance
+
+class AnalysisContext:
+    """Per-request cache of images derived from the preprocessed screenshot.
+
+    Every artifact (grayscale, Otsu binary, edge maps, contours, summed-area
+    tables) is computed on first use and shared by all analyzers afterwards.
+    ``timings`` maps each artifact name to the milliseconds spent building it
+    (including any artifacts it had to build first); ``counters`` holds event
+    counts analyzers record for this request (e.g. OCR tile cache hits).
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self.timings = {}
+        self.counters = {}
+        self._artifacts = {}
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def _memo(self, name, compute):
+        if name not in self._artifacts:
+            t0 = time.perf_counter()
+            self._artifacts[name] = compute()
+            self.timings[name] = round((time.perf_counter() - t0) * 1000, 3)
+        return self._artifacts[name]
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    @property
+    def gray(self):
+        return self._memo("gray", lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def otsu(self):
+        """Otsu-thresholded binary of the grayscale image (used for OCR)."""
+        return self._memo(
+            "otsu",
+            lambda: cv2.threshold(self.gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1],
+        )
+
+    def edges(self, low, high, aperture=3, close=0):
+        """Canny edge map, optionally followed by a morphological close with a `close`x`close` kernel."""
+        name = f"edges({low},{high},{aperture},close={close})"
+
+        def compute():
+            if close:
+                kernel = np.ones((close, close), np.uint8)
+                return cv2.morphologyEx(self.edges(low, high, aperture), cv2.MORPH_CLOSE, kernel)
+            return cv2.Canny(self.gray, low, high, apertureSize=aperture)
+
+        return self._memo(name, compute)
+
+    def contours(self, low, high, aperture=3, close=0):
+        """External contours of an edge map; returns (contours, bounding rects as an Nx4 int array)."""
+        name = f"contours({low},{high},{aperture},close={close})"
+
+        def compute():
+            found, _ = cv2.findContours(
+                self.edges(low, high, aperture, close), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+            )
+            rects = np.array([cv2.boundingRect(c) for c in found], dtype=np.int64).reshape(-1, 4)
+            return found, rects
+
+        return self._memo(name, compute)
+
+    @property
+    def color_integrals(self):
+        """Per-channel summed-area tables of the BGR image and of its square, (h+1, w+1, 3) float64."""
+        return self._memo(
+            "color_integrals",
+            lambda: cv2.integral2(self.image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F),
+        )
+
+    @property
+    def luminance(self):
+        """WCAG relative luminance (sRGB-linearized) per pixel, float64 in [0, 1]."""
+        return self._memo("luminance", lambda: relative_luminance(self.image))
+
+    @property
+    def luminance_integrals(self):
+        """Summed-area tables of luminance, luminance^2 and luminance^3."""
+        def compute():
+            lum = self.luminance
+            sums, squares = cv2.integral2(lum, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            cubes = cv2.integral(lum * lum * lum, sdepth=cv2.CV_64F)
+            return sums, squares, cubes
+
+        return self._memo("luminance_integrals", compute)
+
+    def clip_boxes(self, boxes):
+        """Clip Nx4 (x, y, w, h) boxes to the image; returns x0, y0, x1, y1 and pixel areas."""
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        H, W = self.image.shape[:2]
+        x0 = np.clip(boxes[:, 0], 0, W)
+        y0 = np.clip(boxes[:, 1], 0, H)
+        x1 = np.clip(boxes[:, 0] + boxes[:, 2], 0, W)
+        y1 = np.clip(boxes[:, 1] + boxes[:, 3], 0, H)
+        area = np.maximum(x1 - x0, 0) * np.maximum(y1 - y0, 0)
+        return x0, y0, x1, y1, area
+
+    def box_sums(self, table, boxes):
+        """Sum of the pixels under every box in one vectorized lookup on a summed-area table."""
+        x0, y0, x1, y1, _ = self.clip_boxes(boxes)
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
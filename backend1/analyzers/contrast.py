@@ -0,0 +1,69 @@
+# backend/analyzers/contrast.py
+import numpy as np
+
+# sRGB channel value (0-255) -> linear light, per WCAG 2.x
+_channel = np.arange(256, dtype=np.float64) / 255.0
+SRGB_TO_LINEAR = np.where(_channel <= 0.04045, _channel / 12.92, ((_channel + 0.055) / 1.055) ** 2.4)
+
+# Boxes whose luminance spread is below this have no measurable foreground
+MIN_LUMINANCE_STD = 0.01
+
+
+def relative_luminance(image):
+    """WCAG relative luminance of a BGR uint8 image, float64 in [0, 1]."""
+    linear = SRGB_TO_LINEAR[image]
+    return 0.0722 * linear[..., 0] + 0.7152 * linear[..., 1] + 0.2126 * linear[..., 2]
+
+
+def contrast_ratio(l1, l2):
+    lighter = np.maximum(l1, l2)
+    darker = np.minimum(l1, l2)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def box_contrast_ratios(context, boxes):
+    """WCAG 2.x contrast ratio between foreground and background of every box at once.
+
+    Mean, variance and skewness of each box come from summed-area tables of
+    L, L^2 and L^3 in O(1) per box. Each box is then fitted with a two-level
+    (background/foreground) mixture by matching those moments: the skewness
+    gives the foreground share and which side of the mean it lies on, the
+    variance gives the distance between the two levels. Returns a float
+    array with NaN for empty or uniform boxes.
+    """
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return np.empty(0)
+    sums, squares, cubes = context.luminance_integrals
+    area = context.clip_boxes(boxes)[4].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m1 = context.box_sums(sums, boxes) / area
+        m2 = context.box_sums(squares, boxes) / area
+        m3 = context.box_sums(cubes, boxes) / area
+        var = np.maximum(m2 - m1 * m1, 0.0)
+        std = np.sqrt(var)
+        third = m3 - 3 * m1 * m2 + 2 * m1 ** 3
+        skew = np.where(std > 0, third / np.maximum(std, 1e-12) ** 3, 0.0)
+
+        # Two-point mixture: skew^2 = (1 - 2p)^2 / (p (1 - p)) with p the minority (foreground) share
+        t = 1.0 / (skew * skew + 4.0)
+        p = np.clip((1.0 - np.sqrt(np.maximum(1.0 - 4.0 * t, 0.0))) / 2.0, 1e-3, 0.5)
+        gap = std / np.sqrt(p * (1.0 - p))
+        direction = np.where(skew >= 0, 1.0, -1.0)
+        foreground = np.clip(m1 + direction * (1.0 - p) * gap, 0.0, 1.0)
+        background = np.clip(m1 - direction * p * gap, 0.0, 1.0)
+        ratios = contrast_ratio(foreground, background)
+    return np.where((area > 0) & (std >= MIN_LUMINANCE_STD), ratios, np.nan)
+
+
+def box_color_variance(context, boxes):
+    """Mean over B, G, R of the per-channel pixel variance inside every box (same as np.var per ROI)."""
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return np.empty(0)
+    sums, squares = context.color_integrals
+    area = context.clip_boxes(boxes)[4].astype(np.float64)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = context.box_sums(sums, boxes) / area
+        var = np.maximum(context.box_sums(squares, boxes) / area - mean * mean, 0.0)
+    return var.mean(axis=1)
@@ -4,27 +4,190 @@ import cv2
 import numpy as np
 from PIL import Image
 
+# fast: reduced-size JPEG decode, area resize, no denoise
+# balanced: full decode, area resize, light bilateral filter
+# accurate: full decode, LANCZOS resize, full bilateral filter (original behaviour)
+QUALITY_TIERS = ("fast", "balanced", "accurate")
+
+# Rows of context added around a strip before denoising so its edges match a full-image filter
+_FILTER_CONTEXT = 8
+
+
+def otsu_threshold(histogram):
+    """Otsu threshold of a 256-bin histogram (same choice as cv2.THRESH_OTSU)."""
+    hist = np.asarray(histogram, dtype=np.float64)
+    levels = np.arange(256)
+    w0 = np.cumsum(hist)
+    w1 = w0[-1] - w0
+    s0 = np.cumsum(hist * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu0 = s0 / w0
+        mu1 = (s0[-1] - s0) / w1
+        between = np.nan_to_num(w0 * w1 * (mu0 - mu1) ** 2)
+    return int(np.argmax(between))
+
+
 class ImageProcessor:
-    def __init__(self):
-        print("ImageProcessor initialized")
+    def __init__(self, default_tier="accurate", max_width=1200):
+        if default_tier not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {default_tier}")
+        self.default_tier = default_tier
+        self.max_width = max_width
+        print(f"ImageProcessor initialized (default tier: {default_tier})")
 
-    def preprocess_image(self, image_data):
+    def preprocess_image(self, image_data, tier=None):
         """Convert uploaded image bytes to OpenCV image (BGR) and run basic preprocessing."""
+        tier = tier or self.default_tier
+        if tier not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {tier}")
+        try:
+            if tier == "accurate":
+                return self._preprocess_accurate(image_data)
+            return self._preprocess_fast(image_data, denoise=(tier == "balanced"))
+        except Exception as e:
+            raise Exception(f"Failed to preprocess image: {e}")
+
+    @staticmethod
+    def source_size(image_data):
+        """(width, height) of the uploaded image, read from the image header only."""
+        with Image.open(io.BytesIO(image_data)) as pil_image:
+            return pil_image.size
+
+    def target_size(self, image_data, tier=None):
+        """(width, height) of the preprocessed image, read from the image header only."""
+        tier = tier or self.default_tier
+        width, height = self.source_size(image_data)
+        if width <= self.max_width:
+            return width, height
+        if tier == "accurate":
+            return self.max_width, int(height * (self.max_width / width))
+        return self.max_width, int(height * self.max_width / width)
+
+    def open_strips(self, image_data, tier=None, strip_height=1600, overlap=400):
+        """Decode once and return a StripReader over the preprocessed image (band mode)."""
+        tier = tier or self.default_tier
+        if tier not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {tier}")
         try:
-            pil_image = Image.open(io.BytesIO(image_data))
-            # convert to RGB if needed
-            if pil_image.mode != "RGB":
-                pil_image = pil_image.convert("RGB")
-            # Resize if very large
-            max_width = 1200
-            if pil_image.width > max_width:
-                ratio = max_width / pil_image.width
-                new_h = int(pil_image.height * ratio)
-                pil_image = pil_image.resize((max_width, new_h), Image.Resampling.LANCZOS)
-            # convert to OpenCV BGR
-            cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-            # denoise
-            cv_image = cv2.bilateralFilter(cv_image, d=9, sigmaColor=75, sigmaSpace=75)
-            return cv_image
+            return StripReader(self, image_data, tier, strip_height, overlap)
         except Exception as e:
             raise Exception(f"Failed to preprocess image: {e}")
+
+    def _preprocess_accurate(self, image_data):
+        pil_image = Image.open(io.BytesIO(image_data))
+        # convert to RGB if needed
+        if pil_image.mode != "RGB":
+            pil_image = pil_image.convert("RGB")
+        # Resize if very large
+        max_width = self.max_width
+        if pil_image.width > max_width:
+            ratio = max_width / pil_image.width
+            new_h = int(pil_image.height * ratio)
+            pil_image = pil_image.resize((max_width, new_h), Image.Resampling.LANCZOS)
+        # convert to OpenCV BGR
+        cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        # denoise
+        cv_image = cv2.bilateralFilter(cv_image, d=9, sigmaColor=75, sigmaSpace=75)
+        return cv_image
+
+    def _preprocess_fast(self, image_data, denoise):
+        pil_image = Image.open(io.BytesIO(image_data))
+        width, height = pil_image.size
+        target_w = min(width, self.max_width)
+        target_h = int(height * target_w / width)
+        if pil_image.format == "JPEG" and width > target_w:
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the target size)
+            pil_image.draft("RGB", (target_w, target_h))
+        if pil_image.mode != "RGB":
+            pil_image = pil_image.convert("RGB")
+        cv_image = cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
+        if cv_image.shape[1] != target_w:
+            cv_image = cv2.resize(cv_image, (target_w, target_h), interpolation=cv2.INTER_AREA)
+        if denoise:
+            cv_image = cv2.bilateralFilter(cv_image, d=5, sigmaColor=50, sigmaSpace=50)
+        return cv_image
+
+
+class StripReader:
+    """Preprocessed horizontal strips of one image, for pages too tall to hold whole.
+
+    The upload is decoded once at its stored size (PIL cannot hand out PNG rows
+    incrementally); resizing, color conversion and denoising then run one
+    overlapping strip at a time, so none of the full-size intermediate copies
+    exist. ``ranges`` lists (start, end) rows of each strip in the preprocessed
+    image; iterating yields ``(start, end, bgr_strip)``.
+    """
+
+    def __init__(self, processor, image_data, tier, strip_height, overlap):
+        self.tier = tier
+        pil_image = Image.open(io.BytesIO(image_data))
+        width, height = pil_image.size
+        self.size = processor.target_size(image_data, tier)
+        if tier != "accurate" and pil_image.format == "JPEG" and width > self.size[0]:
+            pil_image.draft("RGB", self.size)
+        if pil_image.mode != "RGB":
+            pil_image = pil_image.convert("RGB")
+        self._image = pil_image
+        self._scale = pil_image.height / self.size[1]
+        step = max(1, strip_height - overlap)
+        target_height = self.size[1]
+        self.ranges = []
+        start = 0
+        while True:
+            end = min(target_height, start + strip_height)
+            self.ranges.append((start, end))
+            if end >= target_height:
+                break
+            start += step
+
+    def gray_histogram(self):
+        """256-bin histogram of the grayscale page, built strip by strip before denoising."""
+        hist = np.zeros(256, dtype=np.int64)
+        for start, end in self.ranges:
+            hist += np.bincount(cv2.cvtColor(self._rows(start, end), cv2.COLOR_BGR2GRAY).ravel(), minlength=256)
+        return hist
+
+    def _rows(self, start, end):
+        """Rows [start, end) of the resized page as BGR, before denoising."""
+        width, height = self.size
+        if self._image.size == self.size:
+            strip = np.asarray(self._image.crop((0, start, width, end)))
+        elif self.tier == "accurate":
+            box = (0, start * self._scale, self._image.width, end * self._scale)
+            strip = np.asarray(self._image.resize((width, end - start), Image.Resampling.LANCZOS, box=box))
+        else:
+            strip = self._area_rows(start, end)
+        return cv2.cvtColor(strip, cv2.COLOR_RGB2BGR)
+
+    def _area_rows(self, start, end):
+        """Rows [start, end) of cv2.INTER_AREA downscaling without resizing the whole page.
+
+        Area resampling is separable: each output row averages the source rows
+        it covers. Those weights are applied to just the needed source rows,
+        then cv2 does the horizontal pass.
+        """
+        scale = self._scale
+        src_top = int(np.floor(start * scale))
+        src_bottom = min(self._image.height, int(np.ceil(end * scale)))
+        source = np.asarray(self._image.crop((0, src_top, self._image.width, src_bottom)), dtype=np.float32)
+        rows = np.arange(src_top, src_bottom)
+        lo = np.arange(start, end)[:, None] * scale
+        weights = np.clip(np.minimum(rows + 1, lo + scale) - np.maximum(rows, lo), 0, None)
+        weights /= weights.sum(axis=1, keepdims=True)
+        vertical = np.tensordot(weights.astype(np.float32), source, axes=1)
+        strip = cv2.resize(vertical, (self.size[0], end - start), interpolation=cv2.INTER_AREA)
+        return np.clip(np.rint(strip), 0, 255).astype(np.uint8)
+
+    def __iter__(self):
+        height = self.size[1]
+        for start, end in self.ranges:
+            if self.tier == "fast":
+                yield start, end, self._rows(start, end)
+                continue
+            top, bottom = max(0, start - _FILTER_CONTEXT), min(height, end + _FILTER_CONTEXT)
+            rows = self._rows(top, bottom)
+            if self.tier == "accurate":
+                rows = cv2.bilateralFilter(rows, d=9, sigmaColor=75, sigmaSpace=75)
+            else:
+                rows = cv2.bilateralFilter(rows, d=5, sigmaColor=50, sigmaSpace=50)
+            yield start, end, np.ascontiguousarray(rows[start - top:start - top + end - start])
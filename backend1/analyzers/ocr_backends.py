@@ -0,0 +1,134 @@
+# backend/analyzers/ocr_backends.py
+import threading
+
+import cv2
+import numpy as np
+import pytesseract
+
+try:  # optional: in-process Tesseract through the C API
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+class OCRBackend:
+    """Word-level OCR over a single-channel uint8 image.
+
+    ``image_to_data`` returns a dict of parallel lists (``text``, ``left``,
+    ``top``, ``width``, ``height``, ``conf``) like pytesseract's DICT output.
+    """
+
+    name = "base"
+
+    def image_to_data(self, gray):
+        raise NotImplementedError
+
+
+class PytesseractBackend(OCRBackend):
+    """Runs the tesseract CLI once per call (temp file + new process)."""
+
+    name = "pytesseract"
+
+    def __init__(self, config="--psm 6"):
+        self.config = config
+
+    def image_to_data(self, gray):
+        return pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT, config=self.config)
+
+
+class TesserocrBackend(OCRBackend):
+    """Keeps a Tesseract engine loaded in memory and feeds it NumPy buffers directly.
+
+    An engine is not thread-safe, so one is created lazily per thread (tiled
+    OCR uses a thread pool) and reused for every later call on that thread.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng"):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.lang = lang
+        self._local = threading.local()
+        self._api()  # load the engine now so a broken install fails at startup
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            # PSM.SINGLE_BLOCK matches pytesseract's --psm 6
+            api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=tesserocr.PSM.SINGLE_BLOCK)
+            self._local.api = api
+        return api
+
+    def image_to_data(self, gray):
+        gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        height, width = gray.shape[:2]
+        api = self._api()
+        api.SetImageBytes(gray.tobytes(), width, height, 1, width)
+        api.Recognize()
+
+        data = {"text": [], "left": [], "top": [], "width": [], "height": [], "conf": []}
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+        level = tesserocr.RIL.WORD
+        for word in tesserocr.iterate_level(iterator, level):
+            bbox = word.BoundingBox(level)
+            if bbox is None:
+                continue
+            x1, y1, x2, y2 = bbox
+            data["text"].append(word.GetUTF8Text(level) or "")
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+            data["conf"].append(word.Confidence(level))
+        return data
+
+
+class StubBackend(OCRBackend):
+    """Tesseract-free stand-in for benchmarks: every dark blob (characters merged
+    horizontally) becomes a word with a fixed confidence. Boxes are realistic,
+    text is a placeholder, so non-OCR stages can be measured without Tesseract.
+    """
+
+    name = "stub"
+
+    def image_to_data(self, gray):
+        ink = (gray < 128).astype(np.uint8)
+        if ink.mean() > 0.5:  # light text on a dark page
+            ink = 1 - ink
+        words = cv2.dilate(ink, np.ones((3, 9), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(words)
+        data = {"text": [], "left": [], "top": [], "width": [], "height": [], "conf": []}
+        for x, y, w, h, _ in stats[1:count]:
+            if w < 4 or h < 4 or h > 200:
+                continue
+            data["text"].append(f"word{len(data['text'])}")
+            data["left"].append(int(x))
+            data["top"].append(int(y))
+            data["width"].append(int(w))
+            data["height"].append(int(h))
+            data["conf"].append(90.0)
+        return data
+
+
+OCR_BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def get_ocr_backend(name="auto"):
+    """Build an OCR backend by name; ``auto`` prefers tesserocr and falls back to pytesseract."""
+    if name in (None, "", "auto"):
+        if tesserocr is not None:
+            try:
+                return TesserocrBackend()
+            except Exception as e:
+                print("tesserocr unavailable, falling back to pytesseract:", e)
+        return PytesseractBackend()
+    if name not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {name}")
+    return OCR_BACKENDS[name]()
@@ -0,0 +1,145 @@
+# backend/analyzers/ocr_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# dHash grid: 8 rows x 32 horizontal gradients = 256 bits, wide to suit full-width bands
+DHASH_ROWS = 8
+DHASH_COLS = 32
+# Perceptual candidates verified per lookup (closest dHash first)
+MAX_CANDIDATES = 8
+_SOLID = np.ones((2, 2), np.uint8)
+
+
+def exact_key(tile):
+    """Hash of the tile's pixels and shape; identical tiles share it."""
+    digest = hashlib.blake2b(np.ascontiguousarray(tile), digest_size=16)
+    digest.update(repr(tile.shape).encode("ascii"))
+    return digest.hexdigest()
+
+
+def dhash(tile):
+    """256-bit difference hash of a single-channel tile, as a Python int."""
+    small = cv2.resize(tile, (DHASH_COLS + 1, DHASH_ROWS), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def same_content(tile, bits):
+    """True if ``tile`` matches a packed 1-bit tile except for isolated edge pixels.
+
+    Re-encoding or a shifted Otsu threshold moves single pixels along glyph
+    edges; a different word leaves solid blocks of differing pixels, which
+    survive a 2x2 erosion of the difference mask.
+    """
+    other = np.unpackbits(bits, count=tile.size).reshape(tile.shape)
+    diff = ((tile > 127) != other).astype(np.uint8)
+    return not cv2.erode(diff, _SOLID).any()
+
+
+def _words_size(words):
+    # rough in-memory footprint: dict + ints + the text itself
+    return sum(240 + len(w["text"]) for w in words) + 64
+
+
+class OCRTileCache:
+    """Byte-capped LRU of OCR words per image tile, with exact and perceptual lookup.
+
+    Words are stored relative to the tile's top-left corner. ``get`` first tries
+    the exact pixel hash, then cached tiles of the same shape whose dHash is
+    within ``tolerance`` bits (0 disables perceptual matching). A dHash is too
+    coarse to tell two button labels apart, so a perceptual candidate is only
+    used if its stored 1-bit pixels pass ``same_content``. Hits count the tile
+    bytes that did not have to go through OCR as ``bytes_saved``.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, tolerance=4):
+        self.max_bytes = max(0, int(max_bytes))
+        self.tolerance = max(0, int(tolerance))
+        self._entries = OrderedDict()  # exact key -> (shape, dhash, packed bits, words, size)
+        self._by_shape = {}  # shape -> {exact key: dhash}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.exact_hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        print(f"OCRTileCache initialized (max {self.max_bytes // 1024} KiB, tolerance {self.tolerance} bits)")
+
+    def get(self, tile):
+        """Return ``(words, kind, keys)``; ``kind`` is "exact", "perceptual" or None on a miss.
+
+        ``keys`` are passed back to ``set`` after OCR so the tile is not hashed twice.
+        """
+        key = exact_key(tile)
+        phash = dhash(tile) if self.tolerance else None
+        with self._lock:
+            found, kind = key, "exact"
+            if key not in self._entries:
+                found = self._nearest(tile, phash) if phash is not None else None
+                kind = "perceptual"
+            if found is None:
+                self.misses += 1
+                return None, None, (key, phash)
+            self._entries.move_to_end(found)
+            if kind == "exact":
+                self.exact_hits += 1
+            else:
+                self.perceptual_hits += 1
+            self.bytes_saved += tile.nbytes
+            return self._entries[found][3], kind, (key, phash)
+
+    def _nearest(self, tile, phash):
+        # caller holds self._lock
+        close = []
+        for key, other in self._by_shape.get(tile.shape, {}).items():
+            distance = (phash ^ other).bit_count()
+            if distance <= self.tolerance:
+                close.append((distance, key))
+        for _, key in sorted(close)[:MAX_CANDIDATES]:
+            if same_content(tile, self._entries[key][2]):
+                return key
+        return None
+
+    def set(self, tile, keys, words):
+        key, phash = keys
+        bits = np.packbits(tile > 127) if phash is not None else None
+        size = _words_size(words) + (bits.nbytes if bits is not None else 0)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (tile.shape, phash, bits, words, size)
+            if phash is not None:
+                self._by_shape.setdefault(tile.shape, {})[key] = phash
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        key, (shape, phash, _, _, size) = self._entries.popitem(last=False)
+        self.bytes -= size
+        if phash is not None:
+            bucket = self._by_shape.get(shape, {})
+            bucket.pop(key, None)
+            if not bucket:
+                self._by_shape.pop(shape, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.perceptual_hits + self.misses
+            hits = self.exact_hits + self.perceptual_hits
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "exact_hits": self.exact_hits,
+                "perceptual_hits": self.perceptual_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
@@ -1,26 +1,48 @@
 import numpy as np
-import cv2
+
+from analyzers.context import AnalysisContext
+from analyzers.contrast import box_contrast_ratios
 
 class UXScorer:
+    # Weights of the detailed scores in the overall score
+    WEIGHTS = {
+        'cta_prominence': 0.3,
+        'visual_hierarchy': 0.25,
+        'accessibility': 0.25,
+        'color_contrast': 0.2
+    }
+    # Scores that need OCR output (CTA classification, text sizes)
+    OCR_SCORES = ("cta_prominence", "visual_hierarchy")
+
     def __init__(self):
         print("UXScorer initialized")
 
-    def calculate_scores(self, image, text_elements, buttons):
+    def calculate_scores(self, image, text_elements, buttons, context=None):
+        try:
+            context = context or AnalysisContext(image)
+            boxes = [(b["x"], b["y"], b["width"], b["height"]) for b in buttons]
+            # Real WCAG ratios for all buttons in one vectorized pass (NaN = nothing to measure)
+            ratios = box_contrast_ratios(context, boxes) if boxes else np.zeros(0)
+            return self.scores_from_measurements(
+                image.shape, text_elements, buttons, ratios, self._count_images(context))
+        except Exception as e:
+            print("Error calculating scores:", e)
+            return self._fallback_scores()
+
+    def scores_from_measurements(self, shape, text_elements, buttons, contrast_ratios, image_count):
+        """Scores from elements plus per-button contrast ratios and an image count measured elsewhere.
+
+        Band mode measures contrast and images strip by strip and scores once at the end.
+        """
         try:
             scores = {}
-            scores["cta_prominence"] = self._calculate_cta_prominence(image, buttons)
+            scores["cta_prominence"] = self._calculate_cta_prominence(shape, buttons)
             scores["visual_hierarchy"] = self._calculate_visual_hierarchy(text_elements)
-            scores["accessibility"] = self._calculate_accessibility(image, text_elements, buttons)
-            scores["color_contrast"] = self._calculate_color_contrast(image, buttons)
+            scores["accessibility"] = self._calculate_accessibility(text_elements, buttons)
+            scores["color_contrast"] = self._calculate_color_contrast(contrast_ratios)
 
             # weighted average
-            weights = {
-                'cta_prominence': 0.3,
-                'visual_hierarchy': 0.25,
-                'accessibility': 0.25,
-                'color_contrast': 0.2
-            }
-            weighted = sum(scores[k] * weights[k] for k in weights)
+            weighted = sum(scores[k] * self.WEIGHTS[k] for k in self.WEIGHTS)
             scores["overall"] = max(45, min(95, int(weighted * 100)))
 
             # ✅ Boost score if all metrics are good
@@ -30,17 +52,43 @@ class UXScorer:
                 scores["color_contrast"] >= 0.65):
                 scores["overall"] = max(scores["overall"], 80)
 
-            scores["image_count"] = self._count_images(image)
+            scores["image_count"] = min(image_count, 5)
             return scores
         except Exception as e:
             print("Error calculating scores:", e)
-            return {
-                "cta_prominence": 0.6, "visual_hierarchy": 0.7,
-                "accessibility": 0.6, "color_contrast": 0.65,
-                "overall": 65, "image_count": 1
-            }
+            return self._fallback_scores()
+
+    def preliminary_scores(self, image, buttons, context=None):
+        """Scores that need no OCR, from contour-detected buttons only (progressive results).
 
-    def _calculate_cta_prominence(self, image, buttons):
+        Accessibility only sees button sizes, and ``overall`` re-weights the
+        available scores; the ``OCR_SCORES`` are left out until OCR finishes.
+        """
+        try:
+            context = context or AnalysisContext(image)
+            boxes = [(b["x"], b["y"], b["width"], b["height"]) for b in buttons]
+            ratios = box_contrast_ratios(context, boxes) if boxes else np.zeros(0)
+            scores = {
+                "accessibility": self._calculate_accessibility([], buttons),
+                "color_contrast": self._calculate_color_contrast(ratios),
+            }
+            weighted = sum(scores[k] * self.WEIGHTS[k] for k in scores) / sum(self.WEIGHTS[k] for k in scores)
+            scores["overall"] = max(45, min(95, int(weighted * 100)))
+            scores["image_count"] = self._count_images(context)
+            return scores
+        except Exception as e:
+            print("Error calculating preliminary scores:", e)
+            fallback = self._fallback_scores()
+            return {k: fallback[k] for k in ("accessibility", "color_contrast", "overall", "image_count")}
+
+    def _fallback_scores(self):
+        return {
+            "cta_prominence": 0.6, "visual_hierarchy": 0.7,
+            "accessibility": 0.6, "color_contrast": 0.65,
+            "overall": 65, "image_count": 1
+        }
+
+    def _calculate_cta_prominence(self, shape, buttons):
         if not buttons:
             return 0.4
         cta_buttons = [b for b in buttons if b.get("type") == "cta"]
@@ -48,7 +96,7 @@ class UXScorer:
             return 0.5
 
         main_cta = max(cta_buttons, key=lambda x: x.get("area", 0))
-        h, w = image.shape[:2]
+        h, w = shape[:2]
         viewport_area = h * w
 
         # size factor
@@ -77,7 +125,7 @@ class UXScorer:
         size_range_score = min(size_range / 30.0, 1.0)
         return (size_variety_score * 0.6) + (size_range_score * 0.4)
 
-    def _calculate_accessibility(self, image, text_elements, buttons):
+    def _calculate_accessibility(self, text_elements, buttons):
         score = 0.5
         if text_elements:
             small_count = sum(1 for el in text_elements if el["height"] < 12)
@@ -92,38 +140,23 @@ class UXScorer:
             score += button_accessibility * 0.3
         return min(score, 1.0)
 
-    def _calculate_color_contrast(self, image, buttons):
-        if not buttons:
+    def _calculate_color_contrast(self, ratios):
+        if len(ratios) == 0:
+            return 0.6
+        ratios = np.asarray(ratios, dtype=np.float64)
+        ratios = ratios[~np.isnan(ratios)]
+        if ratios.size == 0:
             return 0.6
-        contrasts = []
-        for b in buttons:
-            try:
-                roi = image[b["y"]:b["y"]+b["height"], b["x"]:b["x"]+b["width"]]
-                if roi.size == 0:
-                    continue
-                roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                bg_lum = float(roi_gray.mean())
-                text_lum = 0.0 if bg_lum > 128 else 255.0
-                lighter = max(bg_lum, text_lum) / 255.0
-                darker = min(bg_lum, text_lum) / 255.0
-                contrast_ratio = (lighter + 0.05) / (darker + 0.05)
-                normalized = min(contrast_ratio / 4.5, 1.0)
-                contrasts.append(normalized)
-            except Exception:
-                continue
-        return float(np.mean(contrasts)) if contrasts else 0.6
-
-    def _count_images(self, image):
+        return float(np.mean(np.minimum(ratios / 4.5, 1.0)))
+
+    def image_rects(self, context):
+        """Bounding rects (Nx4) of contours large enough to count as images."""
+        _, rects = context.contours(100, 200)
+        return rects[(rects[:, 2] > 100) & (rects[:, 3] > 100)]
+
+    def _count_images(self, context):
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 100, 200)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            count = 0
-            for c in contours:
-                x, y, w, h = cv2.boundingRect(c)
-                if w > 100 and h > 100:
-                    count += 1
-            return min(count, 5)
+            return min(len(self.image_rects(context)), 5)
         except:
             return 1
 
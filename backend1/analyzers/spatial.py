@@ -0,0 +1,146 @@
+# backend/analyzers/spatial.py
+import numpy as np
+
+# Columnar layout for detected elements (text words, buttons)
+BOX_DTYPE = np.dtype([("x", np.int64), ("y", np.int64), ("width", np.int64), ("height", np.int64)])
+
+
+def to_box_array(elements):
+    """Pack a list of element dicts into a structured array of x, y, width, height."""
+    boxes = np.empty(len(elements), dtype=BOX_DTYPE)
+    if elements:
+        boxes["x"] = [el["x"] for el in elements]
+        boxes["y"] = [el["y"] for el in elements]
+        boxes["width"] = [el["width"] for el in elements]
+        boxes["height"] = [el["height"] for el in elements]
+    return boxes
+
+
+class PointGrid:
+    """Uniform-grid index over points for "which points fall inside this box" queries.
+
+    Points are sorted by cell id (row-major), so the cells of one grid row
+    that a query box spans form a single contiguous slice.
+    """
+
+    def __init__(self, xs, ys, cell_size=64):
+        self.xs = np.asarray(xs, dtype=np.int64)
+        self.ys = np.asarray(ys, dtype=np.int64)
+        self.cell = cell_size
+        if len(self.xs) == 0:
+            self.x_min = self.y_min = 0
+            self.cols = self.rows = 1
+        else:
+            self.x_min, self.y_min = int(self.xs.min()), int(self.ys.min())
+            self.cols = int((self.xs.max() - self.x_min) // cell_size) + 1
+            self.rows = int((self.ys.max() - self.y_min) // cell_size) + 1
+        cell_ids = ((self.ys - self.y_min) // cell_size) * self.cols + (self.xs - self.x_min) // cell_size
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.sorted_ids = cell_ids[self.order]
+
+    def query(self, x0, y0, x1, y1):
+        """Sorted indices of points with x0 <= x <= x1 and y0 <= y <= y1."""
+        if len(self.xs) == 0:
+            return self.order
+        c0 = max(0, (x0 - self.x_min) // self.cell)
+        c1 = min(self.cols - 1, (x1 - self.x_min) // self.cell)
+        r0 = max(0, (y0 - self.y_min) // self.cell)
+        r1 = min(self.rows - 1, (y1 - self.y_min) // self.cell)
+        if c0 > c1 or r0 > r1:
+            return self.order[:0]
+        rows = np.arange(r0, r1 + 1)
+        starts = np.searchsorted(self.sorted_ids, rows * self.cols + c0, side="left")
+        ends = np.searchsorted(self.sorted_ids, rows * self.cols + c1, side="right")
+        candidates = np.concatenate([self.order[s:e] for s, e in zip(starts, ends)])
+        xs, ys = self.xs[candidates], self.ys[candidates]
+        hit = candidates[(xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)]
+        return np.sort(hit)
+
+
+def overlapping_pairs(boxes, min_overlap_x, min_overlap_y, cell_size=64):
+    """All pairs (i < j) whose intersection is wider than min_overlap_x and taller than min_overlap_y.
+
+    Boxes are bucketed into every grid cell they cover; only boxes sharing a
+    cell are compared, and the exact overlap test runs as one NumPy batch.
+    """
+    n = len(boxes)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    x0, y0 = boxes["x"], boxes["y"]
+    x1, y1 = x0 + boxes["width"], y0 + boxes["height"]
+    gx0, gy0 = x0.min(), y0.min()
+    cx0, cx1 = (x0 - gx0) // cell_size, (x1 - gx0) // cell_size
+    cy0, cy1 = (y0 - gy0) // cell_size, (y1 - gy0) // cell_size
+    cols = int(cx1.max()) + 1
+
+    # (cell id, box index) for every cell a box covers
+    spans_x, spans_y = cx1 - cx0 + 1, cy1 - cy0 + 1
+    counts = spans_x * spans_y
+    owner = np.repeat(np.arange(n), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell_x = cx0[owner] + local % spans_x[owner]
+    cell_y = cy0[owner] + local // spans_x[owner]
+    cell_ids = cell_y * cols + cell_x
+    order = np.lexsort((owner, cell_ids))
+    cell_ids, owner = cell_ids[order], owner[order]
+    bounds = np.flatnonzero(np.diff(cell_ids)) + 1
+    groups = np.split(owner, bounds)
+
+    pair_chunks = []
+    for members in groups:
+        if len(members) < 2:
+            continue
+        a, b = np.triu_indices(len(members), k=1)
+        pair_chunks.append(np.stack([members[a], members[b]], axis=1))
+    if not pair_chunks:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.unique(np.concatenate(pair_chunks), axis=0)
+
+    i, j = pairs[:, 0], pairs[:, 1]
+    overlap_x = np.maximum(0, np.minimum(x1[i], x1[j]) - np.maximum(x0[i], x0[j]))
+    overlap_y = np.maximum(0, np.minimum(y1[i], y1[j]) - np.maximum(y0[i], y0[j]))
+    return pairs[(overlap_x > min_overlap_x) & (overlap_y > min_overlap_y)]
+
+
+def greedy_nms(boxes, min_overlap_x, min_overlap_y):
+    """Keep-first de-duplication: box i survives unless it overlaps an earlier survivor.
+
+    Returns a boolean mask; equivalent to comparing every box against all
+    previously kept ones, but only overlapping pairs found by the grid are visited.
+    """
+    n = len(boxes)
+    keep = np.ones(n, dtype=bool)
+    pairs = overlapping_pairs(boxes, min_overlap_x, min_overlap_y)
+    if len(pairs) == 0:
+        return keep
+    # CSR of earlier neighbours for each later box
+    pairs = pairs[np.argsort(pairs[:, 1], kind="stable")]
+    later = pairs[:, 1]
+    starts = np.searchsorted(later, np.arange(n), side="left")
+    ends = np.searchsorted(later, np.arange(n), side="right")
+    earlier = pairs[:, 0]
+    for i in np.flatnonzero(ends > starts):
+        if keep[earlier[starts[i]:ends[i]]].any():
+            keep[i] = False
+    return keep
+
+
+def owned_rows(bands, height, overlap):
+    """Rows each band is responsible for when neighbouring bands overlap.
+
+    A band owns [start + overlap // 2, end - overlap // 2), except that the
+    half-margin is not trimmed at the top or bottom of the page. Elements are
+    attributed to the band that owns their vertical center, so an element seen
+    by two bands is kept once.
+    """
+    half = overlap // 2
+    return [(start + half if start > 0 else 0, end - half if end < height else height) for start, end in bands]
+
+
+def centers_in_rows(ys, heights, rows):
+    """Boolean mask of boxes whose vertical center falls in any of the (start, end) row ranges."""
+    cy = np.asarray(ys, dtype=np.int64) + np.asarray(heights, dtype=np.int64) // 2
+    inside = np.zeros(len(cy), dtype=bool)
+    for start, end in rows:
+        inside |= (cy >= start) & (cy < end)
+    return inside
@@ -1,11 +1,41 @@
 # backend/analyzers/text_extractor.py
 import os
 import platform
-import pytesseract
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+import numpy as np
+import pytesseract
+
+from analyzers.context import AnalysisContext
+from analyzers.ocr_backends import get_ocr_backend
+from analyzers.ocr_cache import OCRTileCache
+from analyzers.spatial import centers_in_rows, owned_rows, to_box_array
+
+
+def count_glyphs(binary, enough=None):
+    """Connected components of a binary image (either polarity) with letter-like size and fill.
+
+    Returns the larger of the two polarities' counts; stops after the first
+    polarity once it reaches ``enough``.
+    """
+    best = 0
+    for mask in (binary, cv2.bitwise_not(binary)):
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        w, h, area = stats[1:, 2], stats[1:, 3], stats[1:, 4]
+        fill = area / np.maximum(w * h, 1)
+        glyph = (h >= 6) & (h <= 80) & (w >= 2) & (w <= 2 * h) & (fill > 0.15) & (fill < 0.9)
+        best = max(best, int(np.count_nonzero(glyph)))
+        if enough is not None and best >= enough:
+            break
+    return best
+
 
 class TextExtractor:
-    def __init__(self):
+    def __init__(self, tile_height=1000, tile_overlap=80, tiled_min_height=2000, tile_workers=None,
+                 ocr_backend="auto", tile_cache_bytes=0, tile_cache_tolerance=4, layout_gap=16,
+                 gate_min_glyphs=0, gate_min_edge_density=0.0):
         # Attempt to find Tesseract on Windows if not in PATH
         if platform.system() == "Windows":
             possible_paths = [
@@ -19,33 +49,229 @@ class TextExtractor:
                     break
             else:
                 print("Warning: Tesseract not found in common paths. Ensure tesseract.exe is installed and in PATH.")
-        print("TextExtractor initialized")
+        # Tiled OCR: images at least `tiled_min_height` tall are cut into overlapping
+        # horizontal bands that are recognized in parallel (0 disables tiling)
+        self.tile_height = tile_height
+        self.tile_overlap = tile_overlap
+        self.tiled_min_height = tiled_min_height
+        self.tile_workers = tile_workers or os.cpu_count() or 1
+        self._tile_pool = None
+        self.ocr_backend = get_ocr_backend(ocr_backend)
+        # Tile cache: the page is cut into layout bands at blank rows and each band's
+        # words are cached by pixel hash and dHash, so shared headers/footers skip OCR
+        # (0 bytes disables it)
+        self.layout_gap = layout_gap
+        self.tile_cache = OCRTileCache(tile_cache_bytes, tile_cache_tolerance) if tile_cache_bytes else None
+        # Text gate: pages with fewer glyph-like blobs or a lower edge density than
+        # this are assumed to have no text and skip OCR (0 glyphs disables the gate)
+        self.gate_min_glyphs = gate_min_glyphs
+        self.gate_min_edge_density = gate_min_edge_density
+        print(f"TextExtractor initialized (ocr backend: {self.ocr_backend.name})")
 
-    def extract_text(self, image):
-        """Return list of text elements with bounding boxes using pytesseract."""
+    def extract_text(self, image, context=None):
+        """Return list of text elements with bounding boxes using the configured OCR backend."""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            context = context or AnalysisContext(image)
             # Improve contrast for OCR
-            gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
-            data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT, config='--psm 6')
-            text_elements = []
-            for i, txt in enumerate(data.get("text", [])):
-                txt = (txt or "").strip()
-                conf = data.get("conf", [])[i] if "conf" in data else "-1"
-                try:
-                    conf_val = float(conf)
-                except:
-                    conf_val = -1.0
-                if txt and len(txt) > 1 and conf_val > 30:
-                    text_elements.append({
-                        "text": txt,
-                        "x": int(data["left"][i]),
-                        "y": int(data["top"][i]),
-                        "width": int(data["width"][i]),
-                        "height": int(data["height"][i]),
-                        "confidence": conf_val
-                    })
+            gray = context.otsu
+            if self.tile_cache is not None:
+                return self._extract_cached(gray, context)
+            if self.tiled_min_height and gray.shape[0] >= self.tiled_min_height:
+                return self._extract_tiled(gray)
+            return self._ocr_words(gray)
+        except Exception as e:
+            print("Text extraction error:", e)
+            return []
+
+    def likely_has_text(self, context):
+        """Cheap pre-OCR check; False when edge density or glyph count says the page has no text."""
+        if not self.gate_min_glyphs:
+            return True
+        try:
+            # Canny(50, 150) is shared with button detection through the context
+            edges = context.edges(50, 150)
+            if np.count_nonzero(edges) < self.gate_min_edge_density * edges.size:
+                return False
+            return count_glyphs(context.otsu, self.gate_min_glyphs) >= self.gate_min_glyphs
+        except Exception as e:
+            print("Text gate error:", e)
+            return True
+
+    def extract_text_binary(self, binary, offset_y=0):
+        """OCR an already binarized strip; ``offset_y`` puts the words in page coordinates (band mode)."""
+        try:
+            return self._ocr_words(binary, offset_y)
+        except Exception as e:
+            print("Text extraction error:", e)
+            return []
+
+    def _ocr_words(self, gray, offset_y=0):
+        data = self.ocr_backend.image_to_data(gray)
+        text_elements = []
+        for i, txt in enumerate(data.get("text", [])):
+            txt = (txt or "").strip()
+            conf = data.get("conf", [])[i] if "conf" in data else "-1"
+            try:
+                conf_val = float(conf)
+            except:
+                conf_val = -1.0
+            if txt and len(txt) > 1 and conf_val > 30:
+                text_elements.append({
+                    "text": txt,
+                    "x": int(data["left"][i]),
+                    "y": int(data["top"][i]) + offset_y,
+                    "width": int(data["width"][i]),
+                    "height": int(data["height"][i]),
+                    "confidence": conf_val
+                })
+        return text_elements
+
+    def _band_ranges(self, height):
+        """Split [0, height) into bands of `tile_height` that overlap by `tile_overlap`."""
+        step = max(1, self.tile_height - self.tile_overlap)
+        bands = []
+        start = 0
+        while True:
+            end = min(height, start + self.tile_height)
+            bands.append((start, end))
+            if end >= height:
+                return bands
+            start += step
+
+    def _extract_tiled(self, gray):
+        """OCR overlapping horizontal bands in parallel and merge them in page coordinates.
+
+        pytesseract runs one tesseract process per call and tesserocr releases
+        the GIL while recognizing, so a thread pool is enough to keep several
+        cores busy. A word is kept only by the band that owns its vertical
+        center (each overlap zone is split at its midpoint), which removes the
+        duplicates both neighbours see.
+        """
+        height = gray.shape[0]
+        bands = self._band_ranges(height)
+        if len(bands) == 1:
+            return self._ocr_words(gray)
+        futures = [self._pool().submit(self._ocr_words, gray[s:e], s) for s, e in bands]
+
+        text_elements = []
+        for (own_start, own_end), future in zip(owned_rows(bands, height, self.tile_overlap), futures):
+            for el in future.result():
+                cy = el["y"] + el["height"] // 2
+                if own_start <= cy < own_end:
+                    text_elements.append(el)
+        return text_elements
+
+    def _layout_bands(self, gray):
+        """Row ranges of the page's content blocks, cut where at least ``layout_gap`` rows are blank.
+
+        A row is blank when it is a single color (dark headers count too). Each
+        block is padded by a few blank rows, so the same header or footer gives
+        the same tile on every page regardless of what surrounds it.
+        """
+        height = gray.shape[0]
+        blank = gray.min(axis=1) == gray.max(axis=1)
+        content = np.flatnonzero(~blank)
+        if content.size == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(content) > self.layout_gap)
+        starts = content[np.r_[0, breaks + 1]]
+        ends = content[np.r_[breaks, content.size - 1]] + 1
+        pad = min(4, self.layout_gap // 2)
+        return [(max(0, int(s) - pad), min(height, int(e) + pad)) for s, e in zip(starts, ends)]
+
+    def _extract_cached(self, gray, context):
+        """OCR layout bands through the tile cache; only missing bands go to the OCR backend."""
+        bands = self._layout_bands(gray)
+        tiles = [gray[s:e] for s, e in bands]
+        lookups = [self.tile_cache.get(tile) for tile in tiles]
+        missing = [i for i, (words, _, _) in enumerate(lookups) if words is None]
+        recognized = dict(zip(missing, self._ocr_tiles([tiles[i] for i in missing])))
+
+        text_elements = []
+        for i, ((start, _), tile, (words, kind, keys)) in enumerate(zip(bands, tiles, lookups)):
+            if words is None:
+                words = recognized[i]
+                self.tile_cache.set(tile, keys, words)
+                context.count("ocr_tile_misses")
+            else:
+                context.count(f"ocr_tile_{kind}_hits")
+                context.count("ocr_tile_bytes_saved", tile.nbytes)
+            # cached words are in tile coordinates and shared, so copy while translating
+            text_elements.extend(dict(word, y=word["y"] + start) for word in words)
+        return text_elements
+
+    def _ocr_tiles(self, tiles):
+        """Words of each tile (tile coordinates) with as few OCR calls as possible.
+
+        Tiles are stacked, separated by blank rows, into composites of at most
+        ``tile_height`` rows that are recognized in parallel, so a page of many
+        small bands does not pay the backend's per-call cost for every band.
+        """
+        groups, rows = [], 0
+        for i, tile in enumerate(tiles):
+            if groups and rows + tile.shape[0] <= self.tile_height:
+                groups[-1].append(i)
+                rows += tile.shape[0] + self.layout_gap
+            else:
+                groups.append([i])
+                rows = tile.shape[0] + self.layout_gap
+        futures = [self._pool().submit(self._ocr_stacked, [tiles[i] for i in group]) for group in groups]
+        words = [None] * len(tiles)
+        for group, future in zip(groups, futures):
+            for i, tile_words in zip(group, future.result()):
+                words[i] = tile_words
+        return words
+
+    def _ocr_stacked(self, tiles):
+        offsets, y = [], 0
+        for tile in tiles:
+            offsets.append(y)
+            y += tile.shape[0] + self.layout_gap
+        canvas = np.full((y - self.layout_gap, tiles[0].shape[1]), 255, dtype=np.uint8)
+        for tile, offset in zip(tiles, offsets):
+            canvas[offset:offset + tile.shape[0]] = tile
+        per_tile = [[] for _ in tiles]
+        for el in self._ocr_words(canvas):
+            i = max(0, bisect_right(offsets, el["y"] + el["height"] // 2) - 1)
+            per_tile[i].append(dict(el, y=el["y"] - offsets[i]))
+        return per_tile
+
+    def extract_text_bands(self, image, bands, previous_elements, context=None):
+        """Re-run OCR on the given row bands only and keep ``previous_elements`` elsewhere.
+
+        Bands follow the tiled-OCR margin rule: a band owns the rows at least
+        ``tile_overlap // 2`` inside it (page edges excepted). Previous words
+        centered in an owned zone are dropped and replaced by the words OCR
+        finds there, and words centered below the image (the new version is
+        shorter) are dropped; everything else is reused as is, in its original
+        order.
+        """
+        try:
+            context = context or AnalysisContext(image)
+            gray = context.otsu
+            height = gray.shape[0]
+            owned = owned_rows(bands, height, self.tile_overlap)
+            futures = [self._pool().submit(self._ocr_words, gray[s:e], s) for s, e in bands]
+
+            boxes = to_box_array(previous_elements)
+            stale = centers_in_rows(boxes["y"], boxes["height"], owned + [(height, np.iinfo(np.int64).max)])
+            text_elements = [el for el, drop in zip(previous_elements, stale) if not drop]
+            # Splice each band's words in before the first kept word below it,
+            # inserting bottom band first so earlier positions stay valid
+            inserts = []
+            for i, ((own_start, own_end), future) in enumerate(zip(owned, futures)):
+                words = [el for el in future.result() if own_start <= el["y"] + el["height"] // 2 < own_end]
+                at = next((j for j, el in enumerate(text_elements)
+                           if el["y"] + el["height"] // 2 >= own_start), len(text_elements))
+                inserts.append((at, i, words))
+            for at, _, words in sorted(inserts, reverse=True):
+                text_elements[at:at] = words
             return text_elements
         except Exception as e:
             print("Text extraction error:", e)
             return []
+
+    def _pool(self):
+        if self._tile_pool is None:
+            self._tile_pool = ThreadPoolExecutor(max_workers=self.tile_workers, thread_name_prefix="ocr-tile")
+        return self._tile_pool
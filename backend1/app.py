@@ -1,25 +1,249 @@
 import os
+import json
+import time
 import traceback
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.serving import is_running_from_reloader
 from io import BytesIO
 
-# Local analyzers package
-from analyzers.image_processor import ImageProcessor
-from analyzers.text_extractor import TextExtractor
-from analyzers.button_detector import ButtonDetector
-from analyzers.scorer import UXScorer
+# Local services (analyzers are built once per worker inside the pipeline)
+from analyzers.image_processor import QUALITY_TIERS
+from services.batch import collect_uploads, run_batch
+from services.history import HistoryStore, parse_time
+from services.jobs import JobQueue
+from services.pipeline import PipelineBusy, PipelineService, uses_band_mode
+from services.recording import (VIDEO_EXTENSIONS, ImageSequence, ScreenSegmenter, VideoSource, analyze_recording,
+                                spool_upload)
+from services.result_cache import ResultCache, image_digest, make_cache_key
+from services.revisions import metric_deltas
+from services.tracing import metrics
 
 # App setup
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])  # allow frontend dev
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB
+app.config["MAX_CONTENT_LENGTH"] = int(float(os.environ.get("UX_MAX_UPLOAD_MB", "16")) * 1024 * 1024)
+# Images taken from .zip archives per request (each also capped at MAX_CONTENT_LENGTH once expanded)
+app.config["MAX_ARCHIVE_IMAGES"] = int(os.environ.get("UX_MAX_ARCHIVE_IMAGES", "1000"))
+app.config["QUALITY_TIER"] = os.environ.get("UX_QUALITY_TIER", "accurate")  # fast | balanced | accurate
+app.config["RESULT_CACHE_SIZE"] = int(os.environ.get("UX_CACHE_SIZE", "256"))
+app.config["RESULT_CACHE_DB"] = os.environ.get("UX_CACHE_DB")  # optional SQLite path, shared across workers
+app.config["RESULT_CACHE_DB_ROWS"] = int(os.environ.get("UX_CACHE_DB_ROWS", "10000"))
+app.config["RESULT_CACHE_DB_TTL"] = float(os.environ.get("UX_CACHE_DB_TTL", str(7 * 24 * 3600)))
+
+result_cache = ResultCache(
+    max_entries=app.config["RESULT_CACHE_SIZE"],
+    db_path=app.config["RESULT_CACHE_DB"],
+    max_disk_entries=app.config["RESULT_CACHE_DB_ROWS"],
+    ttl=app.config["RESULT_CACHE_DB_TTL"],
+)
+
+# Revision artifacts (tile hashes, words, button candidates) per screenshot id, for incremental
+# re-analysis; kept next to the results in UX_CACHE_DB when set. 0 disables revisions.
+app.config["REVISION_STORE_SIZE"] = int(os.environ.get("UX_REVISION_STORE_SIZE", "64"))
+app.config["REVISION_STORE_DB_ROWS"] = int(os.environ.get("UX_REVISION_STORE_DB_ROWS", "1000"))
+
+# Own table, so the large artifacts are capped separately from the results
+revision_store = ResultCache(
+    max_entries=app.config["REVISION_STORE_SIZE"],
+    db_path=app.config["RESULT_CACHE_DB"] if app.config["REVISION_STORE_SIZE"] else None,
+    table="revisions",
+    max_disk_entries=app.config["REVISION_STORE_DB_ROWS"],
+    ttl=app.config["RESULT_CACHE_DB_TTL"],
+)
+
+# Analysis history: every result is appended to this SQLite file for trend queries and exports
+# (unset disables history and its endpoints)
+app.config["HISTORY_DB"] = os.environ.get("UX_HISTORY_DB")
+app.config["HISTORY_BATCH_SIZE"] = int(os.environ.get("UX_HISTORY_BATCH_SIZE", "100"))
+
+history = HistoryStore(app.config["HISTORY_DB"]) if app.config["HISTORY_DB"] else None
+
+# Worker pool: UX_WORKERS=0 runs analyses inline on the request thread
+app.config["PIPELINE_WORKERS"] = int(os.environ.get("UX_WORKERS", os.cpu_count() or 1))
+app.config["PIPELINE_QUEUE_SIZE"] = int(os.environ.get("UX_QUEUE_SIZE", "8"))
+app.config["PIPELINE_RETRY_AFTER"] = int(os.environ.get("UX_RETRY_AFTER", "2"))
+app.config["METRICS_ENABLED"] = os.environ.get("UX_METRICS", "1") != "0"  # per-stage timings + /api/metrics
+
+pipeline_service = PipelineService(
+    workers=app.config["PIPELINE_WORKERS"],
+    queue_size=app.config["PIPELINE_QUEUE_SIZE"],
+    retry_after=app.config["PIPELINE_RETRY_AFTER"],
+    tracing=app.config["METRICS_ENABLED"],
+)
+
+# Async jobs: at most JOB_CONCURRENCY hand their analysis to the pipeline pool; results expire after a TTL
+app.config["JOB_CONCURRENCY"] = int(os.environ.get("UX_JOB_CONCURRENCY", "2"))
+app.config["JOB_MAX_PENDING"] = int(os.environ.get("UX_JOB_MAX_PENDING", "100"))
+app.config["JOB_TTL"] = int(os.environ.get("UX_JOB_TTL", "600"))
+
+job_queue = JobQueue(
+    pipeline_service,
+    result_cache,
+    concurrency=app.config["JOB_CONCURRENCY"],
+    max_pending=app.config["JOB_MAX_PENDING"],
+    ttl=app.config["JOB_TTL"],
+    retry_after=app.config["PIPELINE_RETRY_AFTER"],
+    history=history,
+)
+
+
+# Screen recordings: frames sampled per second of video, and how frames are grouped into screens
+app.config["RECORDING_SAMPLE_FPS"] = float(os.environ.get("UX_RECORDING_SAMPLE_FPS", "10"))
+app.config["RECORDING_HASH_BITS"] = int(os.environ.get("UX_RECORDING_HASH_BITS", "10"))
+app.config["RECORDING_MAX_CHANGED"] = float(os.environ.get("UX_RECORDING_MAX_CHANGED", "0.01"))
+app.config["RECORDING_MIN_DURATION"] = float(os.environ.get("UX_RECORDING_MIN_DURATION", "0.5"))
+app.config["RECORDING_MAX_SCREENS"] = int(os.environ.get("UX_RECORDING_MAX_SCREENS", "60"))
+
+
+def _service_gauges():
+    cache = result_cache.stats()
+    pipeline = pipeline_service.stats()
+    jobs = job_queue.stats()
+    gauges = [
+        ("ux_cache_entries", None, cache["entries"]),
+        ("ux_cache_hits", None, cache["hits"]),
+        ("ux_cache_misses", None, cache["misses"]),
+        ("ux_pipeline_workers", None, pipeline["workers"]),
+        ("ux_pipeline_capacity", None, pipeline["capacity"]),
+        ("ux_pipeline_in_flight", None, pipeline["in_flight"]),
+        ("ux_pipeline_rejected", None, pipeline["rejected"]),
+    ]
+    for state in ("queued", "running", "done", "failed"):
+        gauges.append(("ux_jobs", {"state": state}, jobs[state]))
+    return gauges
+
+
+metrics.register_gauges(_service_gauges)
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    if app.config["METRICS_ENABLED"] and request.endpoint:
+        endpoint = request.endpoint
+        started = g.get("request_started", time.perf_counter())
+        metrics.inc("ux_requests_total", endpoint=endpoint, status=response.status_code)
+
+        def observe():
+            metrics.observe("ux_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint)
+
+        # A streamed body (batch, progressive, export, SSE) is still being sent here; time it until closed
+        if response.is_streamed:
+            response.call_on_close(observe)
+        else:
+            observe()
+    return response
+
 
 # Health route
 @app.route("/api/health", methods=["GET"])
 def health_check():
     import cv2
-    return jsonify({"status": "healthy", "opencv_version": cv2.__version__})
+    return jsonify({
+        "status": "healthy",
+        "opencv_version": cv2.__version__,
+        "cache": result_cache.stats(),
+        "pipeline": pipeline_service.stats(),
+        "jobs": job_queue.stats(),
+        "revisions": revision_store.stats(),
+        "history": history.stats() if history is not None else None,
+    })
+
+
+def _analysis_settings():
+    """Per-request analyzer settings (?tier= or form field 'tier'); part of the cache key."""
+    tier = request.args.get("tier") or request.form.get("tier") or app.config["QUALITY_TIER"]
+    if tier not in QUALITY_TIERS:
+        raise ValueError(f"Invalid tier '{tier}' (expected one of: {', '.join(QUALITY_TIERS)})")
+    return {"tier": tier}
+
+
+def _keep_revisions():
+    return app.config["REVISION_STORE_SIZE"] > 0
+
+
+def _revision_key(screenshot_id):
+    return f"revision:{screenshot_id}"
+
+
+def _collect_uploads(files):
+    return collect_uploads(files, max_member_bytes=app.config["MAX_CONTENT_LENGTH"],
+                           max_images=app.config["MAX_ARCHIVE_IMAGES"])
+
+
+def _revision_base(previous_id, settings):
+    """Stored artifacts of ``previous_id``, rebuilt from a re-sent ``previous_image`` if they were evicted.
+
+    Returns ``(artifacts, reason, previous_result)``. Without artifacts the
+    revision runs in full and ``reason`` says why; ``previous_result`` (for
+    the deltas) is then the cached result of ``previous_image``, if any.
+    Raises ValueError when ``previous_image`` is not the ``previous_id`` image.
+    """
+    previous = revision_store.get(_revision_key(previous_id))
+    if previous is not None:
+        return previous, None, previous["result"]
+    base = request.files.get("previous_image")
+    if not _keep_revisions() or base is None or base.filename == "":
+        return None, "previous_unavailable", None
+    base_data = base.read()
+    base_digest = image_digest(base_data)
+    if f"img_{base_digest[:16]}" != previous_id:
+        raise ValueError(f"previous_image is not the image of '{previous_id}'")
+    base_result = result_cache.get(make_cache_key(base_digest, settings))
+    # band mode keeps no artifacts, so there is nothing to rebuild
+    if uses_band_mode(base_data):
+        return None, "band_mode", base_result
+    future = pipeline_service.submit(base_data, previous_id, settings, artifacts=True)
+    base_result = future.result()
+    revision_store.set(_revision_key(previous_id), future.artifacts)
+    return future.artifacts, None, base_result
+
+
+def _project():
+    """Project name a result is filed under in the history (?project= or form field)."""
+    return request.values.get("project", "")
+
+
+def _record_history(results, settings, project=None):
+    if history is not None:
+        history.record(results, _project() if project is None else project, settings.get("tier"))
+
+
+def _history_disabled():
+    return jsonify({"error": "History is disabled (set UX_HISTORY_DB)"}), 404
+
+
+def _history_filters():
+    """Shared filters of the history endpoints, from the query string."""
+    args = request.args
+    return {
+        "project": args.get("project"),
+        "since": parse_time(args.get("since")),
+        "until": parse_time(args.get("until")),
+        "issue": args.get("issue") or None,
+        "no_cta": args.get("no_cta") == "1",
+        "min_score": int(args["min_score"]) if args.get("min_score") else None,
+        "max_score": int(args["max_score"]) if args.get("max_score") else None,
+    }
+
+
+def _busy_response(error):
+    resp = jsonify({"error": "Server busy, please retry shortly"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(error.retry_after)
+    return resp
+
+
+# Prometheus text metrics
+@app.route("/api/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 
 # Main analyze route
 @app.route("/api/analyze", methods=["POST"])
@@ -32,52 +256,344 @@ def analyze_image():
         if file.filename == "":
             return jsonify({"error": "No image selected"}), 400
 
+        try:
+            settings = _analysis_settings()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # Read file directly into memory (no saving to disk)
         image_data = file.read()
 
-        # Initialize processors
-        image_processor = ImageProcessor()
-        text_extractor = TextExtractor()
-        button_detector = ButtonDetector()
-        scorer = UXScorer()
+        # Content-addressed lookup: identical bytes + settings skip the whole pipeline
+        digest = image_digest(image_data)
+        cache_key = make_cache_key(digest, settings)
+        want_timings = request.args.get("debug") == "timings"
+        result = result_cache.get(cache_key)
+        cache_status = "HIT"
+        trace = None
+        if result is None:
+            cache_status = "MISS"
+            future = pipeline_service.submit(image_data, f"img_{digest[:16]}", settings, trace=want_timings,
+                                             artifacts=_keep_revisions())
+            result = future.result()
+            trace = future.trace
+            result_cache.set(cache_key, result)
+            if future.artifacts:
+                revision_store.set(_revision_key(result["screenshot_id"]), future.artifacts)
+
+        # Response
+        response = dict(result)
+        response["filename"] = file.filename.replace(" ", "_")
+        _record_history([response], settings)
+        if want_timings:
+            response["debug"] = {"timings": trace or {}, "cache": cache_status}
 
-        # Preprocess image
-        image = image_processor.preprocess_image(image_data)
+        resp = jsonify(response)
+        resp.headers["X-Cache"] = cache_status
+        return resp
 
-        # Extract elements
-        text_elements = text_extractor.extract_text(image)
-        buttons = button_detector.detect_buttons(image, text_elements)
+    except PipelineBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        print("Error during analysis:", e)
+        print(traceback.format_exc())
+        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
-        # Calculate scores
-        scores = scorer.calculate_scores(image, text_elements, buttons)
-        recommendations = scorer.generate_recommendations(scores, text_elements, buttons)
 
-        # Response
-        response = {
-            "screenshot_id": f"img_{abs(hash(str(image_data))) % 100000}",
-            "filename": file.filename.replace(" ", "_"),
-            "overall_score": scores.get("overall"),
-            "detailed_scores": {
-                "cta_prominence": round(scores.get("cta_prominence", 0), 2),
-                "visual_hierarchy": round(scores.get("visual_hierarchy", 0), 2),
-                "accessibility": round(scores.get("accessibility", 0), 2),
-                "color_contrast": round(scores.get("color_contrast", 0), 2),
-            },
-            "elements_detected": {
-                "buttons": len(buttons),
-                "text_blocks": len(text_elements),
-                "images": scores.get("image_count", 0)
-            },
-            "issues": recommendations.get("issues", []),
-            "recommendations": recommendations.get("suggestions", []),
-        }
+# Revision route: re-analyze a new version of an earlier screenshot, only where it changed
+@app.route("/api/analyze/revision", methods=["POST"])
+def analyze_revision():
+    try:
+        if "image" not in request.files:
+            return jsonify({"error": "No image provided (form key must be 'image')"}), 400
+
+        file = request.files["image"]
+        if file.filename == "":
+            return jsonify({"error": "No image selected"}), 400
+
+        previous_id = request.form.get("previous_id") or request.args.get("previous_id")
+        if not previous_id:
+            return jsonify({"error": "No previous_id provided"}), 400
+
+        try:
+            settings = _analysis_settings()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            previous, reason, previous_result = _revision_base(previous_id, settings)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
+        image_data = file.read()
+        digest = image_digest(image_data)
+        want_timings = request.args.get("debug") == "timings"
+        future = pipeline_service.submit(image_data, f"img_{digest[:16]}", settings, trace=want_timings,
+                                         artifacts=True, previous=previous)
+        result = future.result()
+        # Keep the merged artifacts so the next version can be diffed against this one
+        # (band mode does not produce any; the next revision then runs in full)
+        if future.artifacts:
+            revision_store.set(_revision_key(result["screenshot_id"]), future.artifacts)
+
+        response = dict(result)
+        if previous is None:
+            response["revision"] = {"previous_id": previous_id, "mode": "full", "reason": reason, "bands": []}
+            if previous_result is not None:
+                response["deltas"] = metric_deltas(previous_result, response)
+        response["filename"] = file.filename.replace(" ", "_")
+        _record_history([response], settings)
+        if want_timings:
+            response["debug"] = {"timings": future.trace or {}}
         return jsonify(response)
 
+    except PipelineBusy as e:
+        return _busy_response(e)
     except Exception as e:
-        print("Error during analysis:", e)
+        print("Error during revision analysis:", e)
+        print(traceback.format_exc())
+        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
+
+
+# Batch route: many files (form key 'images') or a .zip, streamed back as NDJSON
+@app.route("/api/analyze/batch", methods=["POST"])
+def analyze_batch():
+    files = request.files.getlist("images") + request.files.getlist("archive")
+    if not any(f.filename for f in files):
+        return jsonify({"error": "No images provided (form key must be 'images' or 'archive')"}), 400
+
+    try:
+        settings = _analysis_settings()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    uploads = _collect_uploads(files)
+    project = _project()
+
+    def generate():
+        # Results go into the history in bulk, one transaction per UX_HISTORY_BATCH_SIZE images
+        pending = []
+        for result in run_batch(uploads, pipeline_service, result_cache, settings):
+            pending.append(result)
+            if len(pending) >= app.config["HISTORY_BATCH_SIZE"]:
+                _record_history(pending, settings, project)
+                pending = []
+            yield json.dumps(result) + "\n"
+        _record_history(pending, settings, project)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# Progressive route: a preliminary result from the non-OCR stages, then the final one, as NDJSON
+@app.route("/api/analyze/progressive", methods=["POST"])
+def analyze_progressive():
+    try:
+        if "image" not in request.files:
+            return jsonify({"error": "No image provided (form key must be 'image')"}), 400
+
+        file = request.files["image"]
+        if file.filename == "":
+            return jsonify({"error": "No image selected"}), 400
+
+        try:
+            settings = _analysis_settings()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Runs as a job: same cache, concurrency limit and 503 on overload
+        job = job_queue.submit(file.read(), file.filename.replace(" ", "_"), settings, progressive=True,
+                               project=_project())
+
+    except PipelineBusy as e:
+        return _busy_response(e)
+
+    def generate():
+        sent = 0
+        while True:
+            events = job_queue.wait_for_events(job, sent)
+            for event in events:
+                if event.get("status") == "partial":
+                    yield json.dumps(dict(event["result"], stage="preliminary")) + "\n"
+            sent += len(events)
+            if job.finished_at is not None and sent >= len(job.events):
+                if job.status == "done":
+                    yield json.dumps(dict(job.result, stage="final", partial=False)) + "\n"
+                else:
+                    yield json.dumps({"stage": "failed", "filename": job.filename, "error": job.error}) + "\n"
+                return
+
+    resp = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# Recording route: a video (form key 'video') or an image sequence ('frames' and/or a .zip under
+# 'archive'), analyzed once per distinct screen and returned as a per-screen timeline
+@app.route("/api/analyze/recording", methods=["POST"])
+def analyze_recording_route():
+    video = request.files.get("video")
+    frames = request.files.getlist("frames") + request.files.getlist("archive")
+    if not (video and video.filename) and not any(f.filename for f in frames):
+        return jsonify({"error": "No recording provided (form key must be 'video', 'frames' or 'archive')"}), 400
+
+    try:
+        settings = _analysis_settings()
+        sample_fps = float(request.values.get("sample_fps", app.config["RECORDING_SAMPLE_FPS"]))
+        fps = float(request.values.get("fps", "1"))
+        if sample_fps < 0 or fps <= 0:
+            raise ValueError("sample_fps must be >= 0 and fps > 0")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    spooled = None
+    try:
+        if video and video.filename:
+            if os.path.splitext(video.filename)[1].lower() not in VIDEO_EXTENSIONS:
+                return jsonify({"error": f"Unsupported video type (expected one of: {', '.join(sorted(VIDEO_EXTENSIONS))})"}), 400
+            spooled = spool_upload(video)
+            try:
+                source = VideoSource(spooled, sample_fps, filename=video.filename.replace(" ", "_"))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            min_duration = app.config["RECORDING_MIN_DURATION"]
+        else:
+            # every image is a deliberate capture, so none is treated as a transition
+            source = ImageSequence(_collect_uploads(frames), fps)
+            min_duration = 0.0
+
+        segmenter = ScreenSegmenter(
+            hash_bits=app.config["RECORDING_HASH_BITS"],
+            max_changed=app.config["RECORDING_MAX_CHANGED"],
+            min_duration=min_duration,
+            max_screens=app.config["RECORDING_MAX_SCREENS"],
+        )
+        try:
+            timeline = analyze_recording(source, segmenter, pipeline_service, result_cache, settings)
+        finally:
+            source.close()
+        _record_history([s["result"] for s in timeline["screens"] if s["result"]], settings)
+        return jsonify(timeline)
+
+    except Exception as e:
+        print("Error during recording analysis:", e)
         print(traceback.format_exc())
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
+    finally:
+        if spooled is not None:
+            os.unlink(spooled)
+
+
+# History routes: filtered listings with cursor pagination, rollups and streamed exports
+@app.route("/api/history", methods=["GET"])
+def history_list():
+    if history is None:
+        return _history_disabled()
+    try:
+        page = history.query(limit=request.args.get("limit", 50), cursor=request.args.get("cursor"),
+                             **_history_filters())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
+
+
+@app.route("/api/history/rollups", methods=["GET"])
+def history_rollups():
+    if history is None:
+        return _history_disabled()
+    try:
+        bucket = request.args.get("bucket", "week")
+        rows = history.rollups(bucket, project=request.args.get("project"),
+                               since=parse_time(request.args.get("since")),
+                               until=parse_time(request.args.get("until")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"bucket": bucket, "rows": rows})
+
+
+@app.route("/api/history/export", methods=["GET"])
+def history_export():
+    if history is None:
+        return _history_disabled()
+    fmt = request.args.get("format", "ndjson")
+    try:
+        chunks = history.export(fmt, **_history_filters())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    resp = Response(stream_with_context(chunks), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f"attachment; filename=ux-history.{fmt}"
+    return resp
+
+
+# Async job routes: submit returns a job id, then poll or subscribe over SSE
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    try:
+        if "image" not in request.files:
+            return jsonify({"error": "No image provided (form key must be 'image')"}), 400
+
+        file = request.files["image"]
+        if file.filename == "":
+            return jsonify({"error": "No image selected"}), 400
+
+        try:
+            settings = _analysis_settings()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        progressive = request.args.get("progressive") == "1"
+        job = job_queue.submit(file.read(), file.filename.replace(" ", "_"), settings, progressive=progressive,
+                               project=_project())
+        response = job.to_dict()
+        response["status_url"] = f"/api/jobs/{job.id}"
+        response["events_url"] = f"/api/jobs/{job.id}/events"
+        return jsonify(response), 202
+
+    except PipelineBusy as e:
+        return _busy_response(e)
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    def generate():
+        sent = 0
+        while True:
+            events = job_queue.wait_for_events(job, sent)
+            for event in events:
+                kind = "partial" if event.get("status") == "partial" else "progress"
+                yield f"event: {kind}\ndata: {json.dumps(event)}\n\n"
+            sent += len(events)
+            if job.finished_at is not None and sent >= len(job.events):
+                yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+# Warm the pool at boot, also under `flask run` and WSGI servers. Spawned
+# workers re-import this script as __mp_main__ and must not start their own.
+# `python app.py` runs under Werkzeug's reloader, whose watcher process only
+# restarts the serving child (WERKZEUG_RUN_MAIN set), so only the child warms up.
+_reloader_watcher = __name__ == "__main__" and not is_running_from_reloader()
+if __name__ != "__mp_main__" and not _reloader_watcher:
+    pipeline_service.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,2 @@
+# backend/benchmarks/__init__.py
+# package marker (can be empty)
@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_history.py
+"""Insert throughput and dashboard query latency of the history store as it grows.
+
+Synthetic analyses (``--projects`` projects, spread over one year) are
+bulk-inserted day by day, as batch runs would record them. At every size in
+``--sizes`` the dashboard queries are timed (median of ``--repeat`` runs):
+weekly average contrast per project from the rollups, the same aggregate
+computed from the raw rows for comparison, the first and a deep page of one
+project's listing, and one page of screens without a CTA. Run from backend1/:
+
+    python -m benchmarks.bench_history --sizes 100000,1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import analysis_result
+from services.history import HistoryStore
+
+DAY = 86400
+
+
+def _timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = 1_700_000_000 - 365 * DAY
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        store = HistoryStore(path)
+        projects = [f"project-{p:02d}" for p in range(args.projects)]
+        total, insert_s = 0, 0.0
+        print(f"{'rows':>8} {'insert/s':>9} {'rollup week':>12} {'raw GROUP BY':>13} {'page 1':>7} "
+              f"{'50 pages':>8} {'no CTA':>7} {'MB':>6}  (ms, median of {args.repeat})")
+        for size in (int(s) for s in args.sizes.split(",")):
+            while total < size:
+                # one batch run per project and day, at the day's timestamp
+                per_batch = max(1, size // (365 * len(projects)))
+                day = rng.randrange(365)
+                project = rng.choice(projects)
+                batch = [analysis_result(rng, total + i) for i in range(min(per_batch, size - total))]
+                t0 = time.perf_counter()
+                store.record(batch, project, "accurate", created_at=start + day * DAY + rng.randrange(DAY))
+                insert_s += time.perf_counter() - t0
+                total += len(batch)
+
+            project = projects[0]
+
+            def deep_page():
+                cursor = None
+                for _ in range(50):
+                    cursor = store.query(limit=50, cursor=cursor, project=project)["next_cursor"]
+
+            def raw_group_by():
+                with store._connect() as conn:
+                    conn.execute(
+                        "SELECT project, (day + 3) / 7, AVG(color_contrast), COUNT(*) FROM analyses "
+                        "GROUP BY project, (day + 3) / 7"
+                    ).fetchall()
+
+            rollup_ms = _timed(lambda: store.rollups("week"), args.repeat)
+            raw_ms = _timed(raw_group_by, args.repeat)
+            page_ms = _timed(lambda: store.query(limit=50, project=project), args.repeat)
+            deep_ms = _timed(deep_page, args.repeat)
+            no_cta_ms = _timed(lambda: store.query(limit=50, project=project, no_cta=True), args.repeat)
+            size_mb = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)) / 2**20
+            print(f"{total:>8} {total / insert_s:>9.0f} {rollup_ms:>12.1f} {raw_ms:>13.1f} {page_ms:>7.1f} "
+                  f"{deep_ms:>8.1f} {no_cta_ms:>7.1f} {size_mb:>6.0f}")
+    finally:
+        for p in (path, path + "-wal", path + "-shm"):
+            if os.path.exists(p):
+                os.unlink(p)
+
+
+if __name__ == "__main__":
+    main()
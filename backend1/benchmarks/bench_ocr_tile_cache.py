@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_ocr_tile_cache.py
+"""Hit rate, bytes saved and OCR time of the OCR tile cache for several layout gaps.
+
+Pages share a site (nav bar and footer) and differ in their body. Each
+layout gap is run on a fresh cache over the same pages; word boxes are
+compared with uncached whole-page OCR (IoU >= 0.5). Run from backend1/:
+
+    python -m benchmarks.bench_ocr_tile_cache --pages 20 --ocr stub --gaps 8,16,32
+"""
+import argparse
+import time
+
+from analyzers.context import AnalysisContext
+from analyzers.image_processor import ImageProcessor
+from analyzers.text_extractor import TextExtractor
+from benchmarks.synthetic import generate_screenshot
+
+
+def _iou(a, b):
+    ix = max(0, min(a["x"] + a["width"], b["x"] + b["width"]) - max(a["x"], b["x"]))
+    iy = max(0, min(a["y"] + a["height"], b["y"] + b["height"]) - max(a["y"], b["y"]))
+    inter = ix * iy
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union else 0.0
+
+
+def _box_recall(found, reference):
+    if not reference:
+        return 1.0
+    return sum(1 for r in reference if any(_iou(r, f) >= 0.5 for f in found)) / len(reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--ocr", default="auto")
+    parser.add_argument("--gaps", default="8,16,32", help="comma-separated layout gaps to compare")
+    parser.add_argument("--tolerance", type=int, default=4, help="dHash bits (0 = exact matches only)")
+    parser.add_argument("--cache-mb", type=float, default=32)
+    args = parser.parse_args()
+
+    processor = ImageProcessor()
+    pages = [processor.preprocess_image(generate_screenshot(width=1200, height=1600, seed=i, site_seed=7)[0])
+             for i in range(args.pages)]
+
+    plain = TextExtractor(tiled_min_height=0, ocr_backend=args.ocr)
+    t0 = time.perf_counter()
+    reference = [plain.extract_text(page, AnalysisContext(page)) for page in pages]
+    baseline_ms = (time.perf_counter() - t0) * 1000 / len(pages)
+
+    print(f"uncached: {baseline_ms:.1f} ms/page")
+    print(f"{'gap':>4} {'tiles/page':>10} {'hit rate':>9} {'exact':>6} {'dhash':>6} {'MB saved':>9} "
+          f"{'cache KiB':>9} {'ms/page':>8} {'box recall':>10}")
+    for gap in (int(g) for g in args.gaps.split(",")):
+        extractor = TextExtractor(ocr_backend=args.ocr, tile_cache_bytes=int(args.cache_mb * 2**20),
+                                  tile_cache_tolerance=args.tolerance, layout_gap=gap)
+        tiles, recalls = 0, []
+        t0 = time.perf_counter()
+        for page, ref in zip(pages, reference):
+            context = AnalysisContext(page)
+            words = extractor.extract_text(page, context)
+            tiles += sum(v for k, v in context.counters.items() if k.endswith(("_hits", "_misses")))
+            recalls.append(_box_recall(words, ref))
+        ms = (time.perf_counter() - t0) * 1000 / len(pages)
+        stats = extractor.tile_cache.stats()
+        print(f"{gap:>4} {tiles / len(pages):>10.1f} {stats['hit_rate']:>9.2%} {stats['exact_hits']:>6} "
+              f"{stats['perceptual_hits']:>6} {stats['bytes_saved'] / 2**20:>9.1f} {stats['bytes'] / 1024:>9.1f} "
+              f"{ms:>8.1f} {sum(recalls) / len(recalls):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# backend/benchmarks/bench_quality_tiers.py
+"""Accuracy vs. latency of the ImageProcessor quality tiers.
+
+Accuracy is measured as agreement with the ``accurate`` tier on the same
+screenshots: button F1 (IoU >= 0.5), OCR word recall and mean |delta| of
+the overall score. Run from backend1/:
+    python -m benchmarks.bench_quality_tiers --images 6 --ocr pytesseract
+
+The OCR backend must run, otherwise the script exits (OCR errors would
+otherwise just yield no words). ``--ocr stub`` reads placeholder text, so
+word recall is then measured on word boxes (IoU >= 0.5) instead of text.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from analyzers.image_processor import QUALITY_TIERS
+from analyzers.ocr_backends import StubBackend
+from benchmarks.synthetic import generate_screenshot
+
+
+def _iou(a, b):
+    ix = max(0, min(a["x"] + a["width"], b["x"] + b["width"]) - max(a["x"], b["x"]))
+    iy = max(0, min(a["y"] + a["height"], b["y"] + b["height"]) - max(a["y"], b["y"]))
+    inter = ix * iy
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union else 0.0
+
+
+def _f1(found, reference):
+    if not found and not reference:
+        return 1.0
+    matched = sum(1 for r in reference if any(_iou(r, f) >= 0.5 for f in found))
+    precision = matched / len(found) if found else 0.0
+    recall = matched / len(reference) if reference else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def _run(pipeline, data, tier):
+    t0 = time.perf_counter()
+    image = pipeline.image_processor.preprocess_image(data, tier=tier)
+    t_pre = time.perf_counter() - t0
+    words = pipeline.text_extractor.extract_text(image)
+    buttons = pipeline.button_detector.detect_buttons(image, words)
+    scores = pipeline.scorer.calculate_scores(image, words, buttons)
+    return t_pre, time.perf_counter() - t0, words, buttons, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--ocr", default="auto", help="OCR backend: auto, pytesseract, tesserocr or stub")
+    args = parser.parse_args()
+
+    os.environ["UX_OCR_BACKEND"] = args.ocr
+    from services.pipeline import AnalysisPipeline
+
+    try:
+        pipeline = AnalysisPipeline()
+        # extract_text swallows OCR errors, so call the backend directly once
+        pipeline.text_extractor.ocr_backend.image_to_data(np.full((32, 32), 255, np.uint8))
+    except Exception as e:
+        sys.exit(f"OCR backend '{args.ocr}' cannot run: {e}")
+    pipeline.warmup()
+    by_box = pipeline.text_extractor.ocr_backend.name == StubBackend.name
+    corpus = [generate_screenshot(width=1920, height=2400, buttons=12, seed=i, fmt="JPEG" if i % 2 == 0 else "PNG")[0]
+              for i in range(args.images)]
+    reference = [_run(pipeline, data, "accurate") for data in corpus]
+
+    recall_label = "word box rec" if by_box else "word recall"
+    print(f"OCR backend: {pipeline.text_extractor.ocr_backend.name}")
+    print(f"{'tier':>9} {'decode+prep ms':>15} {'pipeline ms':>12} {'button F1':>10} {recall_label:>12} {'|d overall|':>12}")
+    for tier in QUALITY_TIERS:
+        pre, total, f1s, recalls, deltas = [], [], [], [], []
+        for data, ref in zip(corpus, reference):
+            t_pre, t_total, words, buttons, scores = _run(pipeline, data, tier)
+            pre.append(t_pre * 1000)
+            total.append(t_total * 1000)
+            f1s.append(_f1(buttons, ref[3]))
+            if by_box:
+                if ref[2]:
+                    recalls.append(sum(1 for r in ref[2] if any(_iou(r, w) >= 0.5 for w in words)) / len(ref[2]))
+            else:
+                ref_words = {w["text"] for w in ref[2]}
+                if ref_words:
+                    recalls.append(len(ref_words & {w["text"] for w in words}) / len(ref_words))
+            deltas.append(abs(scores["overall"] - ref[4]["overall"]))
+        recall = f"{statistics.mean(recalls):.2f}" if recalls else "n/a"
+        print(f"{tier:>9} {statistics.median(pre):>15.1f} {statistics.median(total):>12.1f} "
+              f"{statistics.mean(f1s):>10.2f} {recall:>12} {statistics.mean(deltas):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
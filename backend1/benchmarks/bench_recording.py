@@ -0,0 +1,84 @@
+# backend/benchmarks/bench_recording.py
+"""Keyframe deduplication on a synthetic screen recording.
+
+Writes a recording of a flow through ``--screens`` pages (with revisits,
+cross-fades and a moving cursor), groups its frames into screens and
+compares them with the truth. Analysis time is measured on the keyframes and
+extrapolated to one analysis per recorded frame for the undeduplicated
+baseline. Run from backend1/:
+
+    python -m benchmarks.bench_recording --screens 24 --seconds 60 --ocr stub
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_recording
+from services.recording import ScreenSegmenter, VideoSource
+
+
+def _truth_screen(truth, seconds):
+    for visit in truth:
+        if visit["start"] <= seconds < visit["end"]:
+            return visit["screen"]
+    return truth[-1]["screen"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screens", type=int, default=24)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--sample-fps", type=float, default=10)
+    parser.add_argument("--ocr", default="auto")
+    parser.add_argument("--tier", default="fast")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    os.environ["UX_OCR_BACKEND"] = args.ocr
+    from services.pipeline import AnalysisPipeline
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+        path = f.name
+    try:
+        truth = generate_recording(path, screens=args.screens, seconds=args.seconds, fps=args.fps, seed=args.seed)
+        source = VideoSource(path, args.sample_fps)
+        segmenter = ScreenSegmenter(min_duration=0.5)
+        t0 = time.perf_counter()
+        for index, seconds, frame in source:
+            segmenter.add(index, seconds, frame)
+        segments, screens = segmenter.finish(source.duration)
+        segment_s = time.perf_counter() - t0
+        source.close()
+    finally:
+        os.unlink(path)
+
+    # detected screen -> truth screens seen at its segments' keyframes
+    found = {}
+    for s in segments:
+        if s["screen"] is not None:
+            found.setdefault(s["screen"], set()).add(_truth_screen(truth, s["key_time"]))
+    merged = sum(1 for pages in found.values() if len(pages) > 1)
+    covered = set().union(*found.values()) if found else set()
+
+    pipeline = AnalysisPipeline()
+    pipeline.warmup()
+    t0 = time.perf_counter()
+    for number, screen in enumerate(screens):
+        pipeline.analyze(screen["keyframe"], f"screen_{number}", {"tier": args.tier})
+    analysis_s = time.perf_counter() - t0
+    per_frame = analysis_s / max(1, len(screens))
+
+    print(f"recording: {source.frames} frames, {source.duration:.1f} s, {len(truth)} visits of {args.screens} pages")
+    print(f"sampled {source.sampled} frames at {args.sample_fps:g} fps, decode + segment {segment_s:.2f} s "
+          f"({segment_s * 1000 / max(1, source.sampled):.1f} ms/frame)")
+    print(f"segments {len(segments)} ({sum(s['transition'] for s in segments)} transitions), "
+          f"distinct screens {len(screens)}, truth pages covered {len(covered)}/{args.screens}, "
+          f"merged screens {merged}")
+    print(f"analysis ({args.tier}, ocr {args.ocr}): {per_frame * 1000:.0f} ms/screen")
+    print(f"  deduplicated: {len(screens)} analyses, {analysis_s + segment_s:.1f} s")
+    print(f"  every frame:  {source.frames} analyses, ~{source.frames * per_frame:.0f} s (extrapolated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/benchmarks/bench_spatial.py
+"""Scaling of ButtonDetector text matching and de-duplication, grid index vs. the old list scans.
+
+Run from backend1/:  python -m benchmarks.bench_spatial
+Also checks that both versions return identical results.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analyzers.button_detector import ButtonDetector
+from benchmarks.reference import find_text_in_region, remove_duplicate_buttons
+from benchmarks.synthetic import random_boxes
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    detector = ButtonDetector()
+    rng = np.random.default_rng(0)
+    print(f"{'n':>7} {'match old':>10} {'match new':>10} {'dedupe old':>11} {'dedupe new':>11}  same")
+    for n in (int(v) for v in args.sizes.split(",")):
+        texts = random_boxes(n, rng)
+        regions = random_boxes(max(1, n // 10), rng)
+        buttons = random_boxes(n, rng)
+
+        def match_old():
+            return [find_text_in_region(texts, r["x"], r["y"], r["width"], r["height"]) for r in regions]
+
+        def match_new():
+            index = detector._build_text_index(texts)
+            return [detector._find_text_in_region(texts, r["x"], r["y"], r["width"], r["height"], index)
+                    for r in regions]
+
+        t_mo, m_old = _time(match_old, args.repeat)
+        t_mn, m_new = _time(match_new, args.repeat)
+        t_do, d_old = _time(lambda: remove_duplicate_buttons(buttons), args.repeat)
+        t_dn, d_new = _time(lambda: detector._remove_duplicate_buttons(buttons), args.repeat)
+        same = m_old == m_new and d_old == d_new
+        print(f"{n:>7} {t_mo * 1000:>8.2f}ms {t_mn * 1000:>8.2f}ms {t_do * 1000:>9.2f}ms {t_dn * 1000:>9.2f}ms  {same}")
+
+
+if __name__ == "__main__":
+    main()
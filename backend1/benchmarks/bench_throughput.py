@@ -0,0 +1,45 @@
+# backend/benchmarks/bench_throughput.py
+"""Measure pipeline throughput (images/sec) as the worker pool grows.
+
+Run from backend1/:  python -m benchmarks.bench_throughput --images 32
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import generate_screenshot
+from services.pipeline import PipelineService
+
+
+def run(worker_counts, n_images):
+    images = [generate_screenshot(width=1200, height=1600, seed=i)[0] for i in range(n_images)]
+    rows = []
+    for workers in worker_counts:
+        service = PipelineService(workers=workers, queue_size=n_images)
+        service.start()
+        t0 = time.perf_counter()
+        futures = [service.submit(data, f"bench_{i}", block=True) for i, data in enumerate(images)]
+        for f in futures:
+            f.result()
+        elapsed = time.perf_counter() - t0
+        service.shutdown()
+        rows.append((workers, elapsed, n_images / elapsed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    counts = sorted({0, *range(1, args.max_workers + 1)})
+    rows = run(counts, args.images)
+    base = rows[0][2]
+    print(f"{'workers':>8} {'seconds':>9} {'img/s':>8} {'speedup':>8}")
+    for workers, elapsed, rate in rows:
+        print(f"{workers:>8} {elapsed:>9.2f} {rate:>8.2f} {rate / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_tiled_ocr.py
+"""Compare whole-page OCR with tiled OCR on a tall screenshot as the tile pool grows.
+
+Needs a real tesseract binary. Run from backend1/:
+    python -m benchmarks.bench_tiled_ocr --height 8000
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from analyzers.text_extractor import TextExtractor
+
+
+def _make_tall_page(height, width=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    y = 20
+    while y < height - 40:
+        x = 20
+        while x < width - 200:
+            cv2.putText(image, f"Lorem{rng.integers(100)}", (x, y + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+            x += int(rng.integers(150, 260))
+        y += int(rng.integers(30, 60))
+    return image
+
+
+def _time(extractor, image, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        words = extractor.extract_text(image)
+        best = min(best, time.perf_counter() - t0)
+    return best, len(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--height", type=int, default=8000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    image = _make_tall_page(args.height)
+    baseline, n_words = _time(TextExtractor(tiled_min_height=0), image, args.repeat)
+    print(f"{'mode':>10} {'workers':>8} {'seconds':>9} {'words':>6} {'speedup':>8}")
+    print(f"{'full':>10} {1:>8} {baseline:>9.2f} {n_words:>6} {1.0:>7.2f}x")
+    for workers in range(1, args.max_workers + 1):
+        extractor = TextExtractor(tiled_min_height=1, tile_workers=workers)
+        elapsed, n_words = _time(extractor, image, args.repeat)
+        print(f"{'tiled':>10} {workers:>8} {elapsed:>9.2f} {n_words:>6} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# backend/benchmarks/check_memory_ceiling.py
+"""Assert that band mode keeps peak memory flat for very tall screenshots.
+
+Each height runs in a fresh process that analyzes a synthetic full-page
+capture and reports how far its peak RSS rose above the post-import
+baseline. Band mode keeps one decoded bitmap of the upload (4 bytes per
+pixel in PIL) plus a fixed working set per strip, so the check fails if the
+rise exceeds ``bitmap + --budget-mb`` at any height. Exits non-zero on
+failure. Run from backend1/:
+
+    python -m benchmarks.check_memory_ceiling --heights 10000,30000 --budget-mb 350
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import generate_screenshot
+
+WIDTH = 1200
+
+
+def _child(path):
+    os.environ.setdefault("UX_OCR_BACKEND", "stub")
+    from services.pipeline import AnalysisPipeline
+
+    with open(path, "rb") as f:
+        data = f.read()
+    pipeline = AnalysisPipeline()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = pipeline.analyze(data, "memcheck")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux
+    print(json.dumps({"rise_mb": (peak - baseline) / 1024, "elements": result["elements_detected"]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--heights", default="10000,30000")
+    parser.add_argument("--budget-mb", type=float, default=350, help="allowed rise on top of the decoded bitmap")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child)
+        return
+
+    failed = False
+    print(f"{'height':>7} {'bitmap MB':>10} {'rise MB':>8} {'limit MB':>9}")
+    for height in (int(h) for h in args.heights.split(",")):
+        rise, bitmap_mb = measure(height)
+        limit = bitmap_mb + args.budget_mb
+        ok = rise <= limit
+        failed |= not ok
+        print(f"{height:>7} {bitmap_mb:>10.0f} {rise:>8.0f} {limit:>9.0f}{'' if ok else '  OVER'}")
+    sys.exit(1 if failed else 0)
+
+
+def measure(height):
+    """Analyze a synthetic page of ``height`` rows in a fresh process; returns (rise MB, bitmap MB)."""
+    data, _ = generate_screenshot(width=WIDTH, height=height, text_density=0.5, buttons=height // 500, seed=1)
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        f.write(data)
+    try:
+        env = dict(os.environ, UX_BAND_MIN_HEIGHT=os.environ.get("UX_BAND_MIN_HEIGHT", "8000"))
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-m", "benchmarks.check_memory_ceiling", "--child", f.name],
+                             env=env, cwd=backend, capture_output=True, text=True, check=True).stdout
+    finally:
+        os.unlink(f.name)
+    report = json.loads(out.strip().splitlines()[-1])
+    return report["rise_mb"], WIDTH * height * 4 / 2**20
+
+
+if __name__ == "__main__":
+    main()
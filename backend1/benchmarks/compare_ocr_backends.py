@@ -0,0 +1,54 @@
+# backend/benchmarks/compare_ocr_backends.py
+"""Check that every installed OCR backend yields the same text_elements contract, and time them.
+
+The stub backend returns placeholder text, so it is held to the contract only, not to recall.
+
+Run from backend1/:  python -m benchmarks.compare_ocr_backends
+Exits non-zero if a backend breaks the contract or the backends disagree badly.
+"""
+import argparse
+import sys
+import time
+
+from analyzers.ocr_backends import OCR_BACKENDS, StubBackend
+from analyzers.text_extractor import TextExtractor
+from benchmarks.reference import check_text_elements
+from benchmarks.synthetic import PHRASES, text_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    image = text_page()
+    expected_words = {w.lower() for p in PHRASES for w in p.split() if len(w) > 1}
+    problems = []
+    for name in OCR_BACKENDS:
+        try:
+            extractor = TextExtractor(tiled_min_height=0, ocr_backend=name)
+        except Exception as e:
+            print(f"{name:>12}: skipped ({e})")
+            continue
+        extractor.extract_text(image)  # warm up
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            elements = extractor.extract_text(image)
+        per_call = (time.perf_counter() - t0) / args.repeat
+        problems += check_text_elements(name, elements, image.shape)
+        if name == StubBackend.name:
+            print(f"{name:>12}: {per_call * 1000:8.1f} ms/call, {len(elements)} words, contract only")
+            continue
+        found = {el["text"].lower() for el in elements}
+        recall = len(found & expected_words) / len(expected_words)
+        print(f"{name:>12}: {per_call * 1000:8.1f} ms/call, {len(elements)} words, recall {recall:.2f}")
+        if recall < 0.8:
+            problems.append(f"{name}: recall {recall:.2f} below 0.80")
+
+    for p in problems:
+        print("FAIL", p)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
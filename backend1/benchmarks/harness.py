@@ -0,0 +1,162 @@
+# backend/benchmarks/harness.py
+"""Reproducible per-analyzer and end-to-end benchmarks on synthetic screenshots.
+
+Times ImageProcessor, TextExtractor, ButtonDetector and UXScorer separately
+and the full /api/analyze endpoint through the Flask test client, with
+warmup, repetitions, percentiles and peak traced memory. Run from backend1/:
+
+    python -m benchmarks.harness --ocr stub --out bench.json
+    python -m benchmarks.harness --ocr stub --baseline bench.json   # compare
+
+``--ocr stub`` swaps Tesseract for a connected-components stand-in so the
+non-OCR stages can be benchmarked on machines without Tesseract.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import SCENARIOS, scenario
+
+
+def _measure(fn, warmup, repeat):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    # peak memory from one extra run so tracemalloc overhead stays out of the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    samples = np.array(samples)
+    return {
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p90_ms": round(float(np.percentile(samples, 90)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "peak_mb": round(peak / 2**20, 2),
+        "repeat": repeat,
+    }
+
+
+def run(scenarios, warmup, repeat, tier):
+    # Imported after the environment is configured in main()
+    from analyzers.context import AnalysisContext
+    from app import app
+    from services.pipeline import AnalysisPipeline
+
+    pipeline = AnalysisPipeline()
+    client = app.test_client()
+    results = {}
+    for name in scenarios:
+        data, _ = scenario(name)
+        image = pipeline.image_processor.preprocess_image(data, tier=tier)
+        words = pipeline.text_extractor.extract_text(image)
+        buttons = pipeline.button_detector.detect_buttons(image, words)
+        scores = pipeline.scorer.calculate_scores(image, words, buttons)
+
+        def endpoint():
+            resp = client.post(f"/api/analyze?tier={tier}", data={"image": (io.BytesIO(data), f"{name}.png")})
+            assert resp.status_code == 200, resp.get_json()
+
+        stages = {
+            "ImageProcessor.preprocess_image": lambda: pipeline.image_processor.preprocess_image(data, tier=tier),
+            "TextExtractor.extract_text": lambda: pipeline.text_extractor.extract_text(image, AnalysisContext(image)),
+            "ButtonDetector.detect_buttons": lambda: pipeline.button_detector.detect_buttons(
+                image, words, AnalysisContext(image)),
+            "UXScorer.calculate_scores": lambda: pipeline.scorer.calculate_scores(
+                image, words, buttons, AnalysisContext(image)),
+            "UXScorer.generate_recommendations": lambda: pipeline.scorer.generate_recommendations(
+                scores, words, buttons),
+            "POST /api/analyze": endpoint,
+        }
+        results[name] = {
+            "image": {"bytes": len(data), "width": int(image.shape[1]), "height": int(image.shape[0]),
+                      "words": len(words), "buttons": len(buttons)},
+            "stages": {stage: _measure(fn, warmup, repeat) for stage, fn in stages.items()},
+        }
+        print(f"{name}: " + ", ".join(f"{k.split('.')[-1]} {v['p50_ms']:.1f}ms"
+                                       for k, v in results[name]["stages"].items()), file=sys.stderr)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Print p50 deltas against a baseline run; returns the list of regressions."""
+    regressions = []
+    print(f"{'scenario':<16} {'stage':<36} {'base p50':>10} {'now p50':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for stage, stats in result["stages"].items():
+            before = base["stages"].get(stage)
+            if not before:
+                continue
+            change = stats["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+            flag = "  REGRESSION" if change > threshold else ""
+            print(f"{name:<16} {stage:<36} {before['p50_ms']:>8.1f}ms {stats['p50_ms']:>8.1f}ms {change:>+7.1%}{flag}")
+            if flag:
+                regressions.append((name, stage, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--tier", default="accurate")
+    parser.add_argument("--ocr", default="auto", help="OCR backend: auto, pytesseract, tesserocr or stub")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 slowdown counted as a regression")
+    args = parser.parse_args()
+
+    # Inline pipeline, no result cache: every request runs the full analysis
+    os.environ["UX_OCR_BACKEND"] = args.ocr
+    os.environ["UX_WORKERS"] = "0"
+    os.environ["UX_CACHE_SIZE"] = "0"
+    os.environ.pop("UX_CACHE_DB", None)
+
+    import cv2
+    current = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "ocr": args.ocr,
+            "tier": args.tier,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+        },
+        "results": run(args.scenarios.split(","), args.warmup, args.repeat, args.tier),
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"wrote {args.out}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        sys.exit(1 if regressions else 0)
+    print(json.dumps(current, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# backend/benchmarks/reference.py
+"""Plain reference versions of optimized code paths, and output contract checks.
+
+Benchmarks time the optimized code against these and tests assert both
+return the same results; they are kept simple on purpose, not fast.
+"""
+
+# Keys of every text element, whichever OCR backend produced it
+TEXT_ELEMENT_KEYS = {"text", "x", "y", "width", "height", "confidence"}
+
+
+def find_text_in_region(text_elements, x, y, w, h):
+    """Text of the elements centred in the region, by a scan of every element (ButtonDetector's old matcher)."""
+    found = []
+    for el in text_elements:
+        cx = el["x"] + el["width"] // 2
+        cy = el["y"] + el["height"] // 2
+        if x <= cx <= x + w and y <= cy <= y + h:
+            found.append(el["text"])
+    return " ".join(found) if found else None
+
+
+def remove_duplicate_buttons(buttons):
+    """Buttons not overlapping an earlier kept one, by pairwise scan (ButtonDetector's old de-duplication)."""
+    unique = []
+    for b in buttons:
+        dup = False
+        for u in unique:
+            overlap_x = max(0, min(b["x"]+b["width"], u["x"]+u["width"]) - max(b["x"], u["x"]))
+            overlap_y = max(0, min(b["y"]+b["height"], u["y"]+u["height"]) - max(b["y"], u["y"]))
+            if overlap_x > 10 and overlap_y > 5:
+                dup = True
+                break
+        if not dup:
+            unique.append(b)
+    return unique
+
+
+def check_text_elements(name, elements, shape):
+    """Problems with OCR backend ``name``'s text_elements on an image of ``shape``; empty if they fit the contract."""
+    problems = []
+    height, width = shape[:2]
+    for el in elements:
+        if set(el) != TEXT_ELEMENT_KEYS:
+            problems.append(f"{name}: unexpected keys {sorted(el)}")
+        elif not all(isinstance(el[k], int) for k in ("x", "y", "width", "height")):
+            problems.append(f"{name}: non-int geometry in {el}")
+        elif not (0 <= el["x"] < width and 0 <= el["y"] < height):
+            problems.append(f"{name}: box outside the page {el}")
+        elif not isinstance(el["confidence"], float) or len(el["text"]) < 2:
+            problems.append(f"{name}: bad text/confidence {el}")
+    return problems
@@ -0,0 +1,213 @@
+# backend/benchmarks/synthetic.py
+"""Deterministic synthetic UI screenshots for benchmarks.
+
+``generate_screenshot`` renders a page with a nav bar, a heading, body text
+lines and buttons at a controlled size, text density, button count and
+contrast, and returns the encoded bytes plus the ground-truth boxes.
+``generate_recording`` writes a screen recording of a flow through such pages.
+``text_page`` draws a few known phrases for OCR checks, ``random_boxes``
+scatters bare element boxes for the geometry benchmarks and
+``analysis_result`` fakes the /api/analyze output for the history store.
+"""
+import io
+import random
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+WORDS = ("design", "product", "pricing", "features", "customers", "analytics", "secure", "teams",
+         "workflow", "reports", "simple", "powerful", "integrations", "support", "platform", "insights")
+PHRASES = ("Get Started", "Sign up today", "Pricing", "Contact sales", "Learn more")
+BUTTON_LABELS = ("Get Started", "Sign up", "Buy now", "Learn more", "Contact", "Download", "Try free", "Book demo")
+RESULT_ISSUES = ({"type": "cta_prominence", "reason": "low_cta"},
+                 {"type": "accessibility", "reason": "small_text_or_buttons"},
+                 {"type": "contrast", "reason": "low_contrast"})
+
+# Named presets used by the harness; each maps to generate_screenshot kwargs
+SCENARIOS = {
+    "landing": dict(width=1200, height=900, text_density=0.4, buttons=4),
+    "dashboard_dense": dict(width=1200, height=1600, text_density=0.9, buttons=24),
+    "tall_page": dict(width=1200, height=6000, text_density=0.5, buttons=12),
+    "low_contrast": dict(width=1200, height=900, text_density=0.5, buttons=6, contrast=0.25),
+    "large_upload": dict(width=2400, height=1800, text_density=0.5, buttons=8),
+}
+
+
+def _font(size):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _blend(background, foreground, amount):
+    return tuple(int(round(b + (f - b) * amount)) for b, f in zip(background, foreground))
+
+
+def generate_screenshot(width=1200, height=900, text_density=0.5, buttons=4, contrast=1.0, seed=0, fmt="PNG",
+                        site_seed=None):
+    """Render a synthetic UI screenshot.
+
+    ``text_density`` (0-1) is the share of free rows that get a body text
+    line, ``contrast`` (0-1) scales how far text and button colors move away
+    from the background. Pages with the same ``site_seed`` share their nav
+    bar and get the same footer, like screens of one product. Returns
+    ``(image_bytes, truth)`` where ``truth`` has ``words`` and ``buttons``
+    lists of ``{"text", "x", "y", "width", "height"}``.
+    """
+    rng = random.Random(seed)
+    site = random.Random(site_seed) if site_seed is not None else rng
+    background = (248, 248, 246)
+    text_color = _blend(background, (25, 25, 30), contrast)
+    button_fill = _blend(background, (30, 100, 220), contrast)
+    button_text = _blend(button_fill, (255, 255, 255), contrast)
+
+    im = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(im)
+    truth = {"words": [], "buttons": []}
+
+    def put_words(x, y, words, font, fill):
+        for word in words:
+            left, top, right, bottom = draw.textbbox((x, y), word, font=font)
+            if right > width - 20:
+                break
+            draw.text((x, y), word, font=font, fill=fill)
+            truth["words"].append({"text": word, "x": left, "y": top, "width": right - left, "height": bottom - top})
+            x = right + font.size // 2 if hasattr(font, "size") else right + 6
+
+    # nav bar + heading
+    nav = _blend(background, (30, 35, 45), contrast)
+    draw.rectangle([0, 0, width, 64], fill=nav)
+    put_words(24, 20, [w.capitalize() for w in site.sample(WORDS, 5)], _font(18), background)
+    put_words(60, 110, [w.capitalize() for w in rng.sample(WORDS, 4)], _font(44), text_color)
+
+    # buttons on a grid of rows, body text on the remaining rows
+    body_font = _font(16)
+    row_h = 48
+    footer_h = 120 if site_seed is not None else 0
+    rows = list(range(200, height - row_h - footer_h, row_h))
+    button_rows = set(rng.sample(rows, min(len(rows), (buttons + 2) // 3)))
+    placed = 0
+    for y in rows:
+        if y in button_rows and placed < buttons:
+            x = 60
+            for _ in range(3):
+                if placed >= buttons or x + 220 > width:
+                    break
+                label = rng.choice(BUTTON_LABELS)
+                draw.rounded_rectangle([x, y, x + 200, y + 40], radius=8, fill=button_fill)
+                truth["buttons"].append({"text": label, "x": x, "y": y, "width": 200, "height": 40})
+                put_words(x + 24, y + 10, label.split(), body_font, button_text)
+                placed += 1
+                x += 240 + rng.randint(0, 60)
+        elif rng.random() < text_density:
+            n_words = rng.randint(6, 16)
+            put_words(60, y + 12, [rng.choice(WORDS) for _ in range(n_words)], body_font, text_color)
+
+    if footer_h:
+        draw.rectangle([0, height - footer_h, width, height], fill=nav)
+        for i in range(3):
+            put_words(60, height - footer_h + 20 + i * 30, [w.capitalize() for w in site.sample(WORDS, 6)],
+                      body_font, background)
+
+    buf = io.BytesIO()
+    im.save(buf, fmt, **({"quality": 90} if fmt == "JPEG" else {}))
+    return buf.getvalue(), truth
+
+
+def scenario(name, seed=0, fmt="PNG"):
+    """Bytes and truth for one of the named SCENARIOS."""
+    return generate_screenshot(seed=seed, fmt=fmt, **SCENARIOS[name])
+
+
+def text_page(width=1000, height=700):
+    """A white BGR page with each of ``PHRASES`` on its own line in large dark text."""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for i, phrase in enumerate(PHRASES):
+        cv2.putText(image, phrase, (60, 90 + i * 110), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (20, 20, 20), 3)
+    return image
+
+
+def random_boxes(n, rng, width=1200):
+    """``n`` random ``{"text", "x", "y", "width", "height"}`` boxes from a numpy ``rng``.
+
+    Boxes are word-sized and spread over a page whose height grows with ``n``.
+    """
+    height = max(800, n * 4)
+    boxes = []
+    for i in range(n):
+        w, h = int(rng.integers(20, 120)), int(rng.integers(10, 30))
+        boxes.append({
+            "text": f"w{i}", "x": int(rng.integers(0, width - w)), "y": int(rng.integers(0, height - h)),
+            "width": w, "height": h,
+        })
+    return boxes
+
+
+def analysis_result(rng, n):
+    """A random analysis result shaped like /api/analyze output, numbered ``n``, from a ``random.Random``."""
+    cta = rng.choice((0, 0, 1, 1, 2, 3))
+    return {
+        "screenshot_id": f"img_{n:016x}",
+        "filename": f"screen_{n}.png",
+        "overall_score": rng.randint(45, 95),
+        "detailed_scores": {k: round(rng.random(), 2)
+                            for k in ("cta_prominence", "visual_hierarchy", "accessibility", "color_contrast")},
+        "elements_detected": {"buttons": rng.randint(0, 30), "text_blocks": rng.randint(0, 300),
+                              "images": rng.randint(0, 5), "cta_buttons": cta},
+        "issues": [i for i in RESULT_ISSUES if rng.random() < 0.3],
+    }
+
+
+def generate_recording(path, screens=12, seconds=60, fps=30, width=1280, height=720, revisits=0.25, seed=0):
+    """Write a synthetic screen recording of a user flow through one site to ``path``.
+
+    Each visit shows one of ``screens`` pages while a cursor moves across it,
+    then cross-fades to the next page over 0.3 s. A visit returns to an earlier
+    page with probability ``revisits``. The container follows the file
+    extension (``.mp4`` or ``.avi``). Returns the truth as a list of
+    ``{"screen", "start", "end"}`` visits in seconds, fades included in the
+    visit they lead out of.
+    """
+    rng = random.Random(seed)
+    pages = []
+    for i in range(screens):
+        data, _ = generate_screenshot(width=width, height=height, buttons=rng.randint(2, 6), seed=seed * 1000 + i,
+                                      site_seed=seed)
+        pages.append(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+
+    # every page once, plus revisits of pages already seen
+    order = [0]
+    unseen = list(range(1, screens))
+    while unseen:
+        if rng.random() < revisits and len(order) > 1:
+            order.append(rng.choice([p for p in set(order) if p != order[-1]]))
+        else:
+            order.append(unseen.pop(0))
+    weights = [rng.uniform(1, 3) for _ in order]
+    total = seconds * fps
+    lengths = [max(fps // 2, int(total * w / sum(weights))) for w in weights]
+
+    fourcc = cv2.VideoWriter_fourcc(*("MJPG" if path.lower().endswith(".avi") else "mp4v"))
+    writer = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    fade = max(1, int(0.3 * fps))
+    truth, written = [], 0
+    for n, (page, length) in enumerate(zip(order, lengths)):
+        start = written
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = rng.randrange(width), rng.randrange(height)
+        for f in range(length):
+            frame = pages[page]
+            if n + 1 < len(order) and f >= length - fade:
+                amount = (f - (length - fade) + 1) / (fade + 1)
+                frame = cv2.addWeighted(frame, 1 - amount, pages[order[n + 1]], amount, 0)
+            else:
+                frame = frame.copy()
+                t = f / max(1, length - 1)
+                cv2.circle(frame, (int(x0 + (x1 - x0) * t), int(y0 + (y1 - y0) * t)), 7, (20, 20, 20), -1)
+            writer.write(frame)
+            written += 1
+        truth.append({"screen": page, "start": start / fps, "end": written / fps})
+    writer.release()
+    return truth
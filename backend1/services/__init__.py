@@ -0,0 +1,2 @@
+# backend/services/__init__.py
+# package marker (can be empty)
@@ -0,0 +1,107 @@
+# backend/services/batch.py
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from services.result_cache import image_digest, make_cache_key
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+
+
+def _clean_name(name):
+    return os.path.basename(name or "").replace(" ", "_")
+
+
+def _raise(error):
+    raise error
+
+
+def collect_uploads(files, max_member_bytes=None, max_images=None):
+    """Return [(filename, read_fn)] for every uploaded image, expanding .zip archives.
+
+    Werkzeug closes request files once the view returns, so archives are
+    copied to a private temp file here; member bytes are only read when
+    ``read_fn`` is called, so a large archive is not held in memory at once.
+
+    The upload size limit only bounds the compressed archive, so members that
+    expand past ``max_member_bytes`` are never read, and archive members past
+    ``max_images`` images in total are skipped; both are reported by a
+    ``read_fn`` that raises ValueError, i.e. as inline per-image errors.
+    """
+    uploads = []
+    members = 0
+    for file in files:
+        if not file or file.filename == "":
+            continue
+        if not file.filename.lower().endswith(".zip"):
+            uploads.append((_clean_name(file.filename), (lambda data=file.read(): data)))
+            continue
+        spool = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.stream, spool)
+        spool.seek(0)
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile as e:
+            spool.close()
+            uploads.append((_clean_name(file.filename), (lambda err=e: _raise(err))))
+            continue
+        for info in archive.infolist():
+            ext = os.path.splitext(info.filename)[1].lower()
+            if info.is_dir() or ext not in IMAGE_EXTENSIONS or "__MACOSX" in info.filename:
+                continue
+            members += 1
+            if max_images is not None and members > max_images:
+                error = ValueError(f"Archive holds more than {max_images} images; the rest were skipped")
+                uploads.append((_clean_name(file.filename), (lambda err=error: _raise(err))))
+                break
+            if max_member_bytes is not None and info.file_size > max_member_bytes:
+                error = ValueError(f"Expands to {info.file_size} bytes, over the {max_member_bytes} byte limit")
+                uploads.append((_clean_name(info.filename), (lambda err=error: _raise(err))))
+                continue
+            # ZipExtFile stops at the declared file_size, so the check above bounds the read
+            uploads.append((_clean_name(info.filename), (lambda a=archive, i=info: a.read(i))))
+    return uploads
+
+
+def run_batch(uploads, pipeline_service, result_cache, settings=None):
+    """Analyze uploads across the worker pool, yielding one result dict per image as it finishes.
+
+    Results use the same shape as /api/analyze plus ``index``; failures are
+    reported inline as ``{"index", "filename", "error"}`` and never abort the batch.
+    """
+    window = max(1, pipeline_service.workers)
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            index, filename, cache_key = pending.pop(future)
+            try:
+                result = future.result()
+                result_cache.set(cache_key, result)
+                yield dict(result, index=index, filename=filename)
+            except Exception as e:
+                yield {"index": index, "filename": filename, "error": f"Analysis failed: {str(e)}"}
+
+    for index, (filename, read) in enumerate(uploads):
+        try:
+            image_data = read()
+            digest = image_digest(image_data)
+            cache_key = make_cache_key(digest, settings)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                yield dict(cached, index=index, filename=filename)
+                continue
+            # Keep at most one image per worker in flight so single-image requests still get a slot
+            while len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+            future = pipeline_service.submit(image_data, f"img_{digest[:16]}", settings, block=True)
+            pending[future] = (index, filename, cache_key)
+        except Exception as e:
+            yield {"index": index, "filename": filename, "error": f"Analysis failed: {str(e)}"}
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        yield from collect(done)
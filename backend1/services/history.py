@@ -0,0 +1,313 @@
+# backend/services/history.py
+import csv
+import io
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+SCORES = ("cta_prominence", "visual_hierarchy", "accessibility", "color_contrast")
+ELEMENTS = ("buttons", "text_blocks", "images", "cta_buttons")
+# Issue types with a bit in ``issue_flags`` and a counter in the rollups
+ISSUE_TYPES = ("cta_prominence", "accessibility", "contrast")
+BUCKETS = {
+    "day": "date(day * 86400, 'unixepoch')",
+    # 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+    "week": "date(((day + 3) / 7 * 7 - 3) * 86400, 'unixepoch')",
+    "month": "strftime('%Y-%m-01', day * 86400, 'unixepoch')",
+}
+EXPORT_COLUMNS = ("id", "screenshot_id", "project", "filename", "tier", "created_at", "overall_score") + SCORES + \
+    ELEMENTS + ("issues",)
+MAX_PAGE = 500
+
+_ROLLUP_SUMS = ["sum_overall"] + [f"sum_{s}" for s in SCORES]
+_ROLLUP_ISSUES = [f"issue_{t}" for t in ISSUE_TYPES]
+
+
+def parse_time(value):
+    """Unix seconds from a number or an ISO date/datetime string (UTC if no zone); None passes through."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}' (expected unix seconds or an ISO date)")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _issue_flags(issues):
+    types = {i.get("type") for i in issues or []}
+    return sum(1 << bit for bit, name in enumerate(ISSUE_TYPES) if name in types)
+
+
+class HistoryStore:
+    """SQLite history of analysis results with indexed filters and daily rollups.
+
+    Every analysis becomes one row of flat score, element-count and issue
+    columns. ``rollup_daily`` keeps per project and UTC day the count, score
+    sums, min/max overall score, screens without a CTA and per-issue counts; it
+    is updated in the same transaction as the inserts, so dashboard aggregates
+    read a few rows per project and day instead of scanning the history.
+    Listings use keyset pagination on (created_at, id), which costs the same
+    on the last page as on the first.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.inserted = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "id INTEGER PRIMARY KEY, screenshot_id TEXT NOT NULL, project TEXT NOT NULL DEFAULT '', "
+                "filename TEXT, tier TEXT, created_at REAL NOT NULL, day INTEGER NOT NULL, "
+                "overall_score INTEGER, " + ", ".join(f"{s} REAL" for s in SCORES) + ", "
+                + ", ".join(f"{e} INTEGER" for e in ELEMENTS) + ", "
+                "issue_flags INTEGER NOT NULL DEFAULT 0, issues TEXT);"
+                "CREATE INDEX IF NOT EXISTS idx_analyses_project_time ON analyses (project, created_at);"
+                "CREATE INDEX IF NOT EXISTS idx_analyses_time ON analyses (created_at);"
+                "CREATE INDEX IF NOT EXISTS idx_analyses_screenshot ON analyses (screenshot_id);"
+                "CREATE INDEX IF NOT EXISTS idx_analyses_project_score ON analyses (project, overall_score);"
+                # "screens with no CTA" is a standing dashboard question; keep its index small
+                "CREATE INDEX IF NOT EXISTS idx_analyses_no_cta ON analyses (project, created_at) "
+                "WHERE cta_buttons = 0;"
+                "CREATE TABLE IF NOT EXISTS rollup_daily ("
+                "project TEXT NOT NULL, day INTEGER NOT NULL, count INTEGER NOT NULL, "
+                + ", ".join(f"{c} REAL NOT NULL" for c in _ROLLUP_SUMS) + ", "
+                "min_overall INTEGER, max_overall INTEGER, no_cta INTEGER NOT NULL, "
+                + ", ".join(f"{c} INTEGER NOT NULL" for c in _ROLLUP_ISSUES) + ", "
+                "PRIMARY KEY (project, day)) WITHOUT ROWID;"
+            )
+        print(f"HistoryStore initialized ({self.db_path})")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, results, project="", tier=None, created_at=None):
+        """Insert analysis responses (dicts shaped like /api/analyze) in one transaction; returns the count.
+
+        Items carrying an ``error`` instead of scores (failed batch entries) are skipped.
+        """
+        now = time.time() if created_at is None else created_at
+        rows = []
+        for result in results:
+            if result.get("error") or result.get("overall_score") is None:
+                continue
+            scores = result.get("detailed_scores") or {}
+            elements = result.get("elements_detected") or {}
+            issues = result.get("issues") or []
+            rows.append(
+                (result.get("screenshot_id"), project or "", result.get("filename"), tier, now, int(now // 86400),
+                 result.get("overall_score"))
+                + tuple(scores.get(s) for s in SCORES)
+                + tuple(elements.get(e) for e in ELEMENTS)
+                + (_issue_flags(issues), json.dumps(issues))
+            )
+        if not rows:
+            return 0
+        try:
+            with self._connect() as conn:
+                self._insert(conn, rows)
+        except sqlite3.Error as e:
+            print("History write error:", e)
+            return 0
+        with self._lock:
+            self.inserted += len(rows)
+        return len(rows)
+
+    def _insert(self, conn, rows):
+        columns = ("screenshot_id", "project", "filename", "tier", "created_at", "day", "overall_score") + \
+            SCORES + ELEMENTS + ("issue_flags", "issues")
+        conn.executemany(
+            f"INSERT INTO analyses ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+        # Fold the new rows into their (project, day) rollups: one upsert per group, not per row
+        groups = {}
+        for row in rows:
+            project, day, overall = row[1], row[5], row[6]
+            scores = row[7:7 + len(SCORES)]
+            cta_buttons = row[7 + len(SCORES) + ELEMENTS.index("cta_buttons")]
+            flags = row[-2]
+            group = groups.get((project, day))
+            if group is None:
+                group = groups[(project, day)] = [0] + [0.0] * len(_ROLLUP_SUMS) + [overall, overall, 0] + \
+                    [0] * len(ISSUE_TYPES)
+            group[0] += 1
+            for i, value in enumerate((overall,) + scores):
+                group[1 + i] += value or 0.0
+            n = 1 + len(_ROLLUP_SUMS)
+            group[n] = min(group[n], overall)
+            group[n + 1] = max(group[n + 1], overall)
+            group[n + 2] += cta_buttons == 0
+            for bit in range(len(ISSUE_TYPES)):
+                group[n + 3 + bit] += (flags >> bit) & 1
+        sums = _ROLLUP_SUMS + _ROLLUP_ISSUES + ["no_cta", "count"]
+        conn.executemany(
+            "INSERT INTO rollup_daily (project, day, count, " + ", ".join(_ROLLUP_SUMS)
+            + ", min_overall, max_overall, no_cta, " + ", ".join(_ROLLUP_ISSUES) + ") VALUES ("
+            + ", ".join("?" * (6 + len(_ROLLUP_SUMS) + len(ISSUE_TYPES))) + ") "
+            "ON CONFLICT (project, day) DO UPDATE SET "
+            + ", ".join(f"{c} = {c} + excluded.{c}" for c in sums)
+            + ", min_overall = min(min_overall, excluded.min_overall)"
+            ", max_overall = max(max_overall, excluded.max_overall)",
+            [(project, day) + tuple(group) for (project, day), group in groups.items()],
+        )
+
+    def _filters(self, project=None, since=None, until=None, issue=None, no_cta=False, min_score=None,
+                 max_score=None):
+        clauses, params = [], []
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if issue is not None:
+            if issue not in ISSUE_TYPES:
+                raise ValueError(f"Unknown issue '{issue}' (expected one of: {', '.join(ISSUE_TYPES)})")
+            clauses.append("issue_flags & ? != 0")
+            params.append(1 << ISSUE_TYPES.index(issue))
+        if no_cta:
+            # spelled exactly like the partial index predicate so SQLite can use it
+            clauses.append("cta_buttons = 0")
+        if min_score is not None:
+            clauses.append("overall_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("overall_score <= ?")
+            params.append(max_score)
+        return clauses, params
+
+    def query(self, limit=50, cursor=None, **filters):
+        """One page of analyses, newest first; returns ``{"items", "next_cursor"}``.
+
+        ``cursor`` is the ``next_cursor`` of the previous page. Filters:
+        ``project``, ``since``/``until`` (unix seconds), ``issue`` (one of
+        ``ISSUE_TYPES``), ``no_cta`` and ``min_score``/``max_score``.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE))
+        clauses, params = self._filters(**filters)
+        if cursor:
+            try:
+                created_at, row_id = cursor.split(":")
+                params += [float(created_at), int(row_id)]
+            except ValueError:
+                raise ValueError(f"Invalid cursor '{cursor}'")
+            clauses.append("(created_at, id) < (?, ?)")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"SELECT * FROM analyses {where} ORDER BY created_at DESC, id DESC LIMIT ?", params + [limit + 1]
+            ).fetchall()
+        items = [self._item(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last['created_at']!r}:{last['id']}"
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _item(self, row):
+        return {
+            "id": row["id"],
+            "screenshot_id": row["screenshot_id"],
+            "project": row["project"],
+            "filename": row["filename"],
+            "tier": row["tier"],
+            "created_at": row["created_at"],
+            "overall_score": row["overall_score"],
+            "detailed_scores": {s: row[s] for s in SCORES},
+            "elements_detected": {e: row[e] for e in ELEMENTS},
+            "issues": json.loads(row["issues"] or "[]"),
+        }
+
+    def rollups(self, bucket="week", project=None, since=None, until=None):
+        """Aggregates per project and day/week/month (UTC), read from the daily rollups."""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Invalid bucket '{bucket}' (expected one of: {', '.join(BUCKETS)})")
+        clauses, params = [], []
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(int(since // 86400))
+        if until is not None:
+            clauses.append("day < ?")
+            params.append(int(-(-until // 86400)))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sums = ", ".join(f"SUM({c})" for c in _ROLLUP_SUMS + _ROLLUP_ISSUES)
+        sql = (f"SELECT project, {BUCKETS[bucket]} AS period, SUM(count), {sums}, MIN(min_overall), "
+               f"MAX(max_overall), SUM(no_cta) FROM rollup_daily {where} "
+               f"GROUP BY project, period ORDER BY project, period")
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        out = []
+        for row in rows:
+            project_name, period, count = row[0], row[1], row[2]
+            totals = row[3:3 + len(_ROLLUP_SUMS)]
+            issues = row[3 + len(_ROLLUP_SUMS):3 + len(_ROLLUP_SUMS) + len(ISSUE_TYPES)]
+            out.append({
+                "project": project_name,
+                "period": period,
+                "count": count,
+                "avg": {name: round(total / count, 3)
+                        for name, total in zip(("overall_score",) + SCORES, totals)},
+                "min_overall": row[-3],
+                "max_overall": row[-2],
+                "no_cta": row[-1],
+                "issues": dict(zip(ISSUE_TYPES, issues)),
+            })
+        return out
+
+    def export(self, fmt="ndjson", batch=1000, **filters):
+        """Iterator of CSV or NDJSON text chunks of the matching analyses, oldest first, read in batches."""
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError("Invalid format (expected csv or ndjson)")
+        clauses, params = self._filters(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # validated above, so bad arguments fail before a streamed response starts
+        return self._export_chunks(fmt, batch, where, params)
+
+    def _export_chunks(self, fmt, batch, where, params):
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f"SELECT * FROM analyses {where} ORDER BY created_at, id", params)
+            if fmt == "csv":
+                yield ",".join(EXPORT_COLUMNS) + "\r\n"
+            while True:
+                chunk = rows.fetchmany(batch)
+                if not chunk:
+                    return
+                if fmt == "ndjson":
+                    yield "".join(json.dumps(self._item(row)) + "\n" for row in chunk)
+                else:
+                    buf = io.StringIO()
+                    csv.writer(buf).writerows([row[c] for c in EXPORT_COLUMNS] for row in chunk)
+                    yield buf.getvalue()
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            inserted = self.inserted
+        try:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT SUM(count) FROM rollup_daily").fetchone()[0] or 0
+        except sqlite3.Error:
+            rows = None
+        return {"rows": rows, "inserted": inserted, "path": self.db_path}
@@ -0,0 +1,172 @@
+# backend/services/jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from services.pipeline import AnalysisPipeline, PipelineBusy
+from services.result_cache import image_digest, make_cache_key
+
+
+class Job:
+    """State of one asynchronous analysis, including its progress event log."""
+
+    def __init__(self, filename):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"
+        self.stage = None
+        self.events = []
+        self.result = None
+        self.partial = None
+        self.timings = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress(),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        elif self.partial is not None:
+            data["partial"] = self.partial
+        if self.timings is not None:
+            data["timings"] = self.timings
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+    def progress(self):
+        finished = sum(1 for e in self.events if e.get("status") == "finished")
+        return round(finished / len(AnalysisPipeline.STAGES), 2)
+
+
+class JobQueue:
+    """In-process job queue with a concurrency limit and TTL-based expiry of finished jobs.
+
+    Each job thread hands its analysis to ``pipeline_service`` and waits for a
+    pool slot, so jobs share the workers and admission limit with synchronous
+    requests; per-stage progress is relayed back from the worker.
+    """
+
+    def __init__(self, pipeline_service, result_cache, concurrency=2, max_pending=100, ttl=600, retry_after=2,
+                 history=None):
+        self.pipeline_service = pipeline_service
+        self.result_cache = result_cache
+        self.history = history
+        self.concurrency = max(1, int(concurrency))
+        self.max_pending = max(1, int(max_pending))
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ux-job")
+        self._jobs = {}
+        self._cond = threading.Condition()
+        print(f"JobQueue initialized (concurrency={self.concurrency}, ttl={self.ttl}s)")
+
+    def submit(self, image_data, filename, settings=None, progressive=False, project=""):
+        """Register a job and schedule it; raises PipelineBusy when too many are waiting.
+
+        A ``progressive`` job also emits a ``partial`` event carrying the
+        preliminary (pre-OCR) result, unless the result comes from the cache.
+        Finished results are recorded in the history store under ``project``.
+        """
+        with self._cond:
+            self._expire()
+            active = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if active >= self.max_pending:
+                raise PipelineBusy(self.retry_after)
+            job = Job(filename)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, image_data, settings, progressive, project)
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def wait_for_events(self, job, start, timeout=15.0):
+        """Block until ``job`` has events past index ``start`` (or it finished / timed out)."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(job.events) > start or job.finished_at is not None,
+                timeout=timeout,
+            )
+            return list(job.events[start:])
+
+    def _emit(self, job, **event):
+        with self._cond:
+            event["time"] = time.time()
+            job.events.append(event)
+            self._cond.notify_all()
+
+    def _progress_callback(self, job):
+        def on_progress(stage, status):
+            with self._cond:
+                job.stage = stage
+            self._emit(job, stage=stage, status=status)
+        return on_progress
+
+    def _partial_callback(self, job):
+        def on_partial(preliminary):
+            preliminary = dict(preliminary, filename=job.filename)
+            with self._cond:
+                job.partial = preliminary
+            self._emit(job, stage="preliminary", status="partial", result=preliminary)
+        return on_partial
+
+    def _run(self, job, image_data, settings, progressive=False, project=""):
+        with self._cond:
+            job.status = "running"
+        try:
+            digest = image_digest(image_data)
+            cache_key = make_cache_key(digest, settings)
+            result = self.result_cache.get(cache_key)
+            if result is None:
+                future = self.pipeline_service.submit(
+                    image_data, f"img_{digest[:16]}", settings, block=True,
+                    progress=self._progress_callback(job),
+                    partial=self._partial_callback(job) if progressive else None,
+                )
+                result = future.result()
+                with self._cond:
+                    job.timings = future.trace
+                self.result_cache.set(cache_key, result)
+            else:
+                for stage in AnalysisPipeline.STAGES:
+                    self._emit(job, stage=stage, status="finished", cached=True)
+            with self._cond:
+                job.result = dict(result, filename=job.filename)
+                job.status = "done"
+            if self.history is not None:
+                self.history.record([job.result], project, (settings or {}).get("tier"))
+        except Exception as e:
+            print("Job error:", e)
+            with self._cond:
+                job.error = f"Analysis failed: {str(e)}"
+                job.status = "failed"
+        with self._cond:
+            job.finished_at = time.time()
+            self._cond.notify_all()
+
+    def _expire(self):
+        # caller holds self._cond
+        cutoff = time.time() - self.ttl
+        expired = [jid for jid, j in self._jobs.items() if j.finished_at is not None and j.finished_at < cutoff]
+        for jid in expired:
+            del self._jobs[jid]
+
+    def stats(self):
+        with self._cond:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for j in self._jobs.values():
+                counts[j.status] += 1
+            return dict(counts, concurrency=self.concurrency, ttl=self.ttl)
@@ -0,0 +1,597 @@
+# backend/services/pipeline.py
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+import numpy as np
+
+from analyzers.context import AnalysisContext
+from analyzers.contrast import box_contrast_ratios
+from analyzers.image_processor import ImageProcessor, otsu_threshold
+from analyzers.spatial import centers_in_rows, owned_rows
+from analyzers.text_extractor import TextExtractor
+from analyzers.button_detector import ButtonDetector
+from analyzers.scorer import UXScorer
+from services.revisions import block_hashes, changed_blocks, dirty_bands, metric_deltas
+from services.tracing import Tracer, metrics
+
+
+class PipelineBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Analysis queue is full, retry later")
+        self.retry_after = retry_after
+
+
+class AnalysisPipeline:
+    """Long-lived analyzer instances; build once per process and reuse for every request."""
+
+    STAGES = ("decode", "ocr", "buttons", "scoring")
+    # Band mode strip overlap: the tallest button candidate, so every candidate
+    # centered in a strip's owned rows lies wholly inside that strip
+    BAND_OVERLAP = 400
+
+    def __init__(self, pool_workers=1):
+        self.image_processor = ImageProcessor(default_tier=os.environ.get("UX_QUALITY_TIER", "accurate"))
+        # ``pool_workers`` pipelines run side by side, so they split the CPUs between their OCR tile threads
+        tile_workers = int(os.environ.get("UX_OCR_TILE_WORKERS", "0"))
+        self.text_extractor = TextExtractor(
+            tiled_min_height=int(os.environ.get("UX_OCR_TILE_MIN_HEIGHT", "2000")),
+            tile_workers=tile_workers or max(1, (os.cpu_count() or 1) // max(1, pool_workers)),
+            ocr_backend=os.environ.get("UX_OCR_BACKEND", "auto"),
+            tile_cache_bytes=int(float(os.environ.get("UX_OCR_TILE_CACHE_MB", "0")) * 1024 * 1024),
+            tile_cache_tolerance=int(os.environ.get("UX_OCR_TILE_CACHE_TOLERANCE", "4")),
+            layout_gap=int(os.environ.get("UX_OCR_LAYOUT_GAP", "16")),
+            gate_min_glyphs=int(os.environ.get("UX_TEXT_GATE_MIN_GLYPHS", "2")),
+            gate_min_edge_density=float(os.environ.get("UX_TEXT_GATE_MIN_EDGE_DENSITY", "0.0001")),
+        )
+        self.button_detector = ButtonDetector()
+        self.scorer = UXScorer()
+        # Revisions: tile size for change detection, and the share of rows above
+        # which an incremental re-analysis falls back to a full one
+        self.revision_block = int(os.environ.get("UX_REVISION_BLOCK", "32"))
+        self.revision_max_change = float(os.environ.get("UX_REVISION_MAX_CHANGE", "0.5"))
+        # Band mode: uploads at least this tall (source rows, which set the size of the
+        # decoded bitmap) are processed in strips of band_height preprocessed rows
+        self.band_min_height = band_min_height()
+        self.band_height = int(os.environ.get("UX_BAND_HEIGHT", "1600"))
+
+    def warmup(self):
+        """Touch OpenCV and Tesseract once so the first real request doesn't pay for it."""
+        dummy = np.full((64, 160, 3), 255, dtype=np.uint8)
+        cv2.putText(dummy, "Warm", (5, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        try:
+            dummy = cv2.bilateralFilter(dummy, d=9, sigmaColor=75, sigmaSpace=75)
+            text_elements = self.text_extractor.extract_text(dummy)
+            buttons = self.button_detector.detect_buttons(dummy, text_elements)
+            self.scorer.calculate_scores(dummy, text_elements, buttons)
+        except Exception as e:
+            print("Pipeline warmup error:", e)
+
+    def analyze(self, image_data, screenshot_id, settings=None, progress=None, trace=None, artifacts=None,
+                previous=None, partial=None):
+        """Run the full pipeline on raw image bytes and build the response body.
+
+        ``settings`` holds per-request options (``tier``: fast/balanced/accurate).
+        ``progress`` is an optional ``callback(stage, status)`` called with
+        ``"started"``/``"finished"`` around each of the stages in ``STAGES``.
+        If a ``trace`` dict is given, ``trace["stages"]`` receives wall/CPU
+        time and image size per analyzer call, ``trace["artifacts"]`` the
+        build time (ms) of every derived image in the AnalysisContext and
+        ``trace["counters"]`` analyzer event counts (OCR tile cache hits,
+        skipped OCR).
+
+        OCR is skipped (no text elements) when the text gate finds no
+        text-like structure. ``partial`` is an optional ``callback(response)``
+        called before OCR with a preliminary response built from the stages
+        that need no OCR (see ``_preliminary_response``).
+
+        If an ``artifacts`` dict is given it receives what a later revision of
+        this screenshot needs (tile hashes, words, button candidates, result).
+        Passing an earlier analysis's artifacts as ``previous`` re-runs OCR and
+        button detection only on the bands whose tiles changed, and adds
+        ``revision`` and per-metric ``deltas`` to the response.
+
+        Pages at least ``band_min_height`` tall go through band mode instead
+        (see ``_analyze_banded``), which keeps no artifacts and sends no
+        preliminary response.
+        """
+        report = progress or (lambda stage, status: None)
+        tracer = Tracer(enabled=trace is not None)
+        settings = settings or {}
+        tier = settings.get("tier") or self.image_processor.default_tier
+
+        if self._use_bands(image_data):
+            response = self._analyze_banded(image_data, screenshot_id, tier, report, tracer, trace)
+            if previous is not None:
+                response["revision"] = {"previous_id": previous["result"]["screenshot_id"], "mode": "full",
+                                        "reason": "band_mode", "bands": []}
+                response["deltas"] = metric_deltas(previous["result"], response)
+            return response
+
+        # Preprocess image
+        report("decode", "started")
+        with tracer.stage("preprocess_image"):
+            image = self.image_processor.preprocess_image(image_data, tier=tier)
+        context = AnalysisContext(image)
+        hashes = None
+        revision = None
+        if artifacts is not None or previous is not None:
+            with tracer.stage("hash_blocks"):
+                hashes = block_hashes(image, self.revision_block)
+        if previous is not None:
+            revision = self._plan_revision(previous, image, hashes, tier)
+        incremental = revision is not None and revision["mode"] == "incremental"
+        report("decode", "finished")
+
+        # Text gate: a page without text-like structure skips OCR altogether
+        run_ocr = True
+        if not incremental:
+            with tracer.stage("text_gate"):
+                run_ocr = self.text_extractor.likely_has_text(context)
+
+        # Progressive results: scores that need no OCR go out first
+        candidates = None
+        if partial is not None and not incremental:
+            with tracer.stage("preliminary_scores"):
+                candidates = self.button_detector.find_candidates(context)
+                preliminary = self._preliminary_response(screenshot_id, image, candidates, context, run_ocr)
+            partial(preliminary)
+
+        # Extract elements (only inside changed bands for an incremental revision)
+        report("ocr", "started")
+        with tracer.stage("extract_text"):
+            if incremental:
+                text_elements = self.text_extractor.extract_text_bands(
+                    image, revision["bands"], previous["text_elements"], context)
+            elif run_ocr:
+                text_elements = self.text_extractor.extract_text(image, context)
+            else:
+                text_elements = []
+                context.count("ocr_skipped")
+        report("ocr", "finished")
+        report("buttons", "started")
+        with tracer.stage("detect_buttons"):
+            if incremental:
+                buttons, candidates = self.button_detector.detect_buttons_bands(
+                    image, revision["bands"], previous["candidates"], text_elements,
+                    self.text_extractor.tile_overlap, context)
+            else:
+                buttons = self.button_detector.detect_buttons(image, text_elements, context, candidates)
+                if artifacts is not None and candidates is None:
+                    # contours are memoized in the context, so this only re-filters them
+                    candidates = self.button_detector.find_candidates(context)
+        report("buttons", "finished")
+
+        # Calculate scores
+        report("scoring", "started")
+        with tracer.stage("calculate_scores"):
+            scores = self.scorer.calculate_scores(image, text_elements, buttons, context)
+        with tracer.stage("generate_recommendations"):
+            recommendations = self.scorer.generate_recommendations(scores, text_elements, buttons)
+        report("scoring", "finished")
+
+        if trace is not None:
+            tracer.set_image(image)
+            trace["stages"] = tracer.records
+            trace["artifacts"] = dict(context.timings)
+            trace["counters"] = dict(context.counters)
+
+        response = self._build_response(screenshot_id, scores, text_elements, buttons, recommendations)
+        if revision is not None:
+            revision["bands"] = [list(band) for band in revision["bands"]]
+            response["revision"] = revision
+            response["deltas"] = metric_deltas(previous["result"], response)
+
+        if artifacts is not None:
+            artifacts.update({
+                "tier": tier,
+                "width": int(image.shape[1]),
+                "height": int(image.shape[0]),
+                "block": self.revision_block,
+                "block_hashes": hashes,
+                "text_elements": text_elements,
+                "candidates": candidates.tolist(),
+                "result": response,
+            })
+        return response
+
+    def _build_response(self, screenshot_id, scores, text_elements, buttons, recommendations):
+        return {
+            "screenshot_id": screenshot_id,
+            "overall_score": scores.get("overall"),
+            "detailed_scores": {
+                "cta_prominence": round(scores.get("cta_prominence", 0), 2),
+                "visual_hierarchy": round(scores.get("visual_hierarchy", 0), 2),
+                "accessibility": round(scores.get("accessibility", 0), 2),
+                "color_contrast": round(scores.get("color_contrast", 0), 2),
+            },
+            "elements_detected": {
+                "buttons": len(buttons),
+                "text_blocks": len(text_elements),
+                "images": scores.get("image_count", 0),
+                "cta_buttons": sum(1 for b in buttons if b.get("type") == "cta"),
+            },
+            "issues": recommendations.get("issues", []),
+            "recommendations": recommendations.get("suggestions", []),
+        }
+
+    def _preliminary_response(self, screenshot_id, image, candidates, context, run_ocr):
+        """Response shaped like the final one from contour buttons, contrast and images only.
+
+        Scores that need OCR, the text block count, issues and recommendations
+        are left empty; ``pending`` lists the missing scores and ``ocr`` tells
+        whether OCR will still run ("pending") or was skipped by the text gate.
+        """
+        buttons = self.button_detector.buttons_from_candidates(candidates, [])
+        scores = self.scorer.preliminary_scores(image, buttons, context)
+        return {
+            "screenshot_id": screenshot_id,
+            "partial": True,
+            "pending": list(self.scorer.OCR_SCORES),
+            "ocr": "pending" if run_ocr else "skipped",
+            "overall_score": scores["overall"],
+            "detailed_scores": {
+                "cta_prominence": None,
+                "visual_hierarchy": None,
+                "accessibility": round(scores["accessibility"], 2),
+                "color_contrast": round(scores["color_contrast"], 2),
+            },
+            "elements_detected": {
+                "buttons": len(buttons),
+                "text_blocks": None,
+                "images": scores["image_count"],
+                "cta_buttons": None,
+            },
+            "issues": [],
+            "recommendations": [],
+        }
+
+    def _use_bands(self, image_data):
+        return uses_band_mode(image_data, self.band_min_height)
+
+    def _analyze_banded(self, image_data, screenshot_id, tier, report, tracer, trace):
+        """Band mode for very tall pages: peak memory stays flat however tall the page is.
+
+        Preprocessing, OCR, button candidates and the contrast/image measurements
+        run one overlapping strip at a time; only element lists and per-box
+        contrast ratios are kept between strips. An element belongs to the strip
+        that owns its vertical center (as in tiled OCR). OCR binarizes every
+        strip with one Otsu threshold taken from the whole page's histogram.
+        """
+        report("decode", "started")
+        with tracer.stage("preprocess_image"):
+            strips = self.image_processor.open_strips(image_data, tier, self.band_height, self.BAND_OVERLAP)
+            threshold = otsu_threshold(strips.gray_histogram())
+        width, height = strips.size
+        report("decode", "finished")
+
+        text_elements, candidates, contrast, image_count = [], [], {}, 0
+        report("ocr", "started")
+        with tracer.stage("analyze_strips"):
+            owned = owned_rows(strips.ranges, height, self.BAND_OVERLAP)
+            for (start, _, strip), rows in zip(strips, owned):
+                context = AnalysisContext(strip)
+                binary = cv2.threshold(context.gray, threshold, 255, cv2.THRESH_BINARY)[1]
+                words = self.text_extractor.extract_text_binary(binary, start)
+                ys = [w["y"] for w in words]
+                heights = [w["height"] for w in words]
+                words = [w for w, keep in zip(words, centers_in_rows(ys, heights, [rows])) if keep]
+                found = self.button_detector.find_candidates(context)
+                found = found[centers_in_rows(found[:, 1] + start, found[:, 3], [rows])]
+                rects = self.scorer.image_rects(context)
+                image_count += int(np.count_nonzero(centers_in_rows(rects[:, 1] + start, rects[:, 3], [rows])))
+
+                # Contrast of every box that may become a button, while its pixels are in memory
+                boxes = found[:, :4].tolist() + [[w["x"], w["y"] - start, w["width"], w["height"]] for w in words]
+                if boxes:
+                    for (x, y, w, h), ratio in zip(boxes, box_contrast_ratios(context, boxes)):
+                        contrast[(x, y + start, w, h)] = ratio
+                found[:, 1] += start
+                candidates.append(found)
+                text_elements.extend(words)
+        report("ocr", "finished")
+
+        report("buttons", "started")
+        with tracer.stage("detect_buttons"):
+            buttons = self.button_detector.buttons_from_candidates(np.concatenate(candidates), text_elements)
+        report("buttons", "finished")
+
+        report("scoring", "started")
+        with tracer.stage("calculate_scores"):
+            ratios = [contrast.get((b["x"], b["y"], b["width"], b["height"]), np.nan) for b in buttons]
+            scores = self.scorer.scores_from_measurements(
+                (height, width), text_elements, buttons, ratios, image_count)
+        with tracer.stage("generate_recommendations"):
+            recommendations = self.scorer.generate_recommendations(scores, text_elements, buttons)
+        report("scoring", "finished")
+
+        if trace is not None:
+            tracer.set_size(width, height)
+            trace["stages"] = tracer.records
+            trace["artifacts"] = {}
+            trace["counters"] = {"band_strips": len(strips.ranges)}
+        return self._build_response(screenshot_id, scores, text_elements, buttons, recommendations)
+
+    def _plan_revision(self, previous, image, hashes, tier):
+        """Decide between incremental and full re-analysis against ``previous`` artifacts."""
+        height, width = image.shape[:2]
+        plan = {
+            "previous_id": previous["result"]["screenshot_id"],
+            "mode": "full",
+            "reason": None,
+            "changed_blocks": None,
+            "total_blocks": len(hashes) * len(hashes[0]),
+            "reanalyzed_fraction": 1.0,
+            "bands": [],
+        }
+        if previous.get("tier") != tier:
+            plan["reason"] = "tier_changed"
+        elif previous.get("width") != width or previous.get("block") != self.revision_block:
+            plan["reason"] = "size_changed"
+        else:
+            changed = changed_blocks(previous["block_hashes"], hashes)
+            bands = dirty_bands(changed, self.revision_block, height, self.text_extractor.tile_overlap)
+            fraction = sum(end - start for start, end in bands) / height
+            plan["changed_blocks"] = int(changed.sum())
+            plan["reanalyzed_fraction"] = round(fraction, 4)
+            if fraction > self.revision_max_change:
+                plan["reason"] = "large_change"
+            else:
+                plan["mode"] = "incremental"
+                plan["bands"] = bands
+        return plan
+
+
+def band_min_height():
+    """Source rows from which uploads are analyzed in band mode (``UX_BAND_MIN_HEIGHT``, 0 = never)."""
+    return int(os.environ.get("UX_BAND_MIN_HEIGHT", "8000"))
+
+
+def uses_band_mode(image_data, min_height=None):
+    """Whether an upload goes through band mode, which keeps no revision artifacts (header read only)."""
+    min_height = band_min_height() if min_height is None else min_height
+    if not min_height:
+        return False
+    try:
+        return ImageProcessor.source_size(image_data)[1] >= min_height
+    except Exception:
+        return False  # let the regular path report the decode error
+
+
+# One pipeline per process (the Flask process and every pool worker)
+_process_pipeline = None
+
+
+def get_pipeline(pool_workers=1):
+    global _process_pipeline
+    if _process_pipeline is None:
+        _process_pipeline = AnalysisPipeline(pool_workers)
+        _process_pipeline.warmup()
+    return _process_pipeline
+
+
+def _init_worker(pool_workers):
+    get_pipeline(pool_workers)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_analysis(image_data, screenshot_id, settings, traced, keep_artifacts=False, previous=None,
+                  progress=None, partial=None):
+    trace = {} if traced else None
+    artifacts = {} if keep_artifacts else None
+    result = get_pipeline().analyze(image_data, screenshot_id, settings, progress=progress, trace=trace,
+                                    artifacts=artifacts, previous=previous, partial=partial)
+    return result, trace, artifacts
+
+
+def _analyze_in_worker(image_data, screenshot_id, settings, traced, keep_artifacts=False, previous=None,
+                       events=None, partial=False):
+    # ``events`` is a queue the parent relays to its progress/partial callbacks; None ends it
+    if events is None:
+        return _run_analysis(image_data, screenshot_id, settings, traced, keep_artifacts, previous)
+    on_partial = (lambda preliminary: events.put(("partial", (preliminary,)))) if partial else None
+    try:
+        return _run_analysis(image_data, screenshot_id, settings, traced, keep_artifacts, previous,
+                             progress=lambda stage, status: events.put(("progress", (stage, status))),
+                             partial=on_partial)
+    finally:
+        events.put(None)
+
+
+class PipelineService:
+    """Dispatches analyses to a bounded process pool of pre-warmed workers.
+
+    At most ``workers + queue_size`` analyses are admitted at once; further
+    submissions raise ``PipelineBusy`` instead of piling up request threads.
+    ``workers=0`` runs analyses inline on the calling thread. Workers are
+    started with ``start_method`` rather than forked from the (threaded) web
+    process, so they never inherit a lock held by another thread.
+    """
+
+    def __init__(self, workers=None, queue_size=None, retry_after=2, tracing=True, start_method=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, int(workers))
+        if queue_size is None:
+            queue_size = max(1, self.workers) * 2
+        self.queue_size = max(0, int(queue_size))
+        self.capacity = max(1, self.workers + self.queue_size)
+        self.retry_after = retry_after
+        self.tracing = tracing
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        print(f"PipelineService initialized (workers={self.workers}, capacity={self.capacity})")
+
+    def start(self):
+        """Spawn and warm up the worker processes ahead of the first request."""
+        if self.workers == 0:
+            get_pipeline()
+            return
+        executor = self._get_executor()
+        pings = [executor.submit(_ping) for _ in range(self.workers)]
+        for p in pings:
+            p.result()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.workers,),
+                )
+            return self._executor
+
+    def _event_queue(self):
+        # Pool tasks cannot take a plain multiprocessing.Queue; a manager's proxy can
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context(self.start_method).Manager()
+            return self._manager.Queue()
+
+    def _reset_executor(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, image_data, screenshot_id, settings=None, block=False, trace=False, artifacts=False,
+               previous=None, progress=None, partial=None):
+        """Queue one analysis and return a Future; raises PipelineBusy when full.
+
+        The Future resolves to the response body. When tracing is on (``trace``
+        or the service-wide ``tracing`` flag) its ``trace`` attribute holds the
+        stage timings, which are also fed into the metrics registry. With
+        ``artifacts`` its ``artifacts`` attribute holds the revision artifacts;
+        ``previous`` runs an incremental revision (see ``AnalysisPipeline.analyze``).
+
+        ``progress`` and ``partial`` are the callbacks of
+        ``AnalysisPipeline.analyze``. The worker sends their events back over a
+        queue and a relay thread calls them in this process; all of them have
+        run by the time the Future resolves.
+        """
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self.rejected += 1
+            raise PipelineBusy(self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+
+        traced = trace or self.tracing
+        outer = Future()
+        outer.trace = None
+        outer.artifacts = None
+        args = (image_data, screenshot_id, settings, traced, artifacts, previous)
+        relayed = progress is not None or partial is not None
+
+        if self.workers == 0:
+            inner = Future()
+            try:
+                inner.set_result(_run_analysis(*args, progress=progress, partial=partial))
+            except Exception as e:
+                inner.set_exception(e)
+            self._finish(inner, outer)
+            return outer
+
+        try:
+            events = None
+            if relayed:
+                events = self._event_queue()
+                args += (events, partial is not None)
+            try:
+                inner = self._get_executor().submit(_analyze_in_worker, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool and retry once
+                self._reset_executor()
+                inner = self._get_executor().submit(_analyze_in_worker, *args)
+        except Exception:
+            self._release(None)
+            raise
+        relay = None
+        if events is not None:
+            relay = threading.Thread(target=self._relay, args=(events, inner, progress, partial), daemon=True)
+            relay.start()
+        inner.add_done_callback(lambda f: self._finish(f, outer, relay))
+        return outer
+
+    def _relay(self, events, inner, progress, partial):
+        # Runs until the worker's end marker, or until its task ended without one (worker died)
+        while True:
+            try:
+                event = events.get(timeout=0.5)
+            except queue.Empty:
+                if inner.done():
+                    return
+                continue
+            except Exception:
+                return
+            if event is None:
+                return
+            kind, args = event
+            callback = progress if kind == "progress" else partial
+            try:
+                if callback is not None:
+                    callback(*args)
+            except Exception as e:
+                print("Progress callback error:", e)
+
+    def _finish(self, inner, outer, relay=None):
+        # Deliver the remaining events, free the slot and record metrics before the caller sees the result
+        if relay is not None:
+            relay.join()
+        self._release(inner)
+        error = inner.exception() if not inner.cancelled() else PipelineBusy(self.retry_after)
+        if error is not None:
+            outer.set_exception(error)
+            return
+        result, trace, artifacts = inner.result()
+        if trace is not None:
+            metrics.record_trace(trace)
+            outer.trace = trace
+        outer.artifacts = artifacts
+        outer.set_result(result)
+
+    def _release(self, future):
+        if future is not None and not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset_executor()
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None:
+                self.completed += 1
+        self._slots.release()
+
+    def analyze(self, image_data, screenshot_id, settings=None):
+        return self.submit(image_data, screenshot_id, settings).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._reset_executor()
+        with self._lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+            self._manager = None
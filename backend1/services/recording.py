@@ -0,0 +1,262 @@
+# backend/services/recording.py
+import math
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+from analyzers.ocr_cache import dhash
+from services.batch import run_batch
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".m4v", ".webm", ".mkv", ".avi"}
+# Frames are compared as grayscale thumbnails this wide
+THUMB_WIDTH = 128
+# Thumbnail pixels differing by more than this many gray levels count as changed
+PIXEL_TOLERANCE = 16
+
+
+def frame_signature(frame):
+    """``(dhash, thumbnail)`` of a BGR frame, used to tell screens apart cheaply."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    size = (THUMB_WIDTH, max(1, round(height * THUMB_WIDTH / width)))
+    thumb = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return dhash(thumb), thumb
+
+
+def changed_fraction(a, b):
+    """Share of thumbnail pixels that differ by more than ``PIXEL_TOLERANCE`` (1.0 if sizes differ)."""
+    if a.shape != b.shape:
+        return 1.0
+    return np.count_nonzero(cv2.absdiff(a, b) > PIXEL_TOLERANCE) / a.size
+
+
+def spool_upload(file):
+    """Copy an uploaded video to a temp file with the same extension and return its path.
+
+    OpenCV only opens videos by path, and FFmpeg sniffs the extension. The
+    caller removes the file.
+    """
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+        shutil.copyfileobj(file.stream, spool)
+    return spool.name
+
+
+class VideoSource:
+    """Frames of a video file, about ``sample_fps`` per second (0 = every frame).
+
+    Skipped frames are grabbed but never retrieved, which saves their color
+    conversion. Raises ValueError if OpenCV cannot open the file.
+    """
+
+    kind = "video"
+
+    def __init__(self, path, sample_fps=10, filename=None):
+        self.filename = filename or os.path.basename(path)
+        self.sample_fps = sample_fps
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            self.close()
+            raise ValueError(f"Could not decode video '{self.filename}'")
+        fps = self._capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and math.isfinite(fps) and fps > 0 else 30.0
+        self.frames = 0
+        self.sampled = 0
+        self.errors = []
+
+    @property
+    def duration(self):
+        return self.frames / self.fps
+
+    def __iter__(self):
+        step = max(1, round(self.fps / self.sample_fps)) if self.sample_fps else 1
+        while self._capture.grab():
+            index = self.frames
+            self.frames += 1
+            if index % step:
+                continue
+            ok, frame = self._capture.retrieve()
+            if ok:
+                self.sampled += 1
+                yield index, index / self.fps, frame
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class ImageSequence:
+    """Frames of an image sequence (``collect_uploads`` output), shown ``fps`` frames per second.
+
+    Images that fail to decode are skipped and listed in ``errors``.
+    """
+
+    kind = "images"
+
+    def __init__(self, uploads, fps=1.0):
+        self.uploads = uploads
+        self.filename = None
+        self.fps = fps
+        self.frames = 0
+        self.sampled = 0
+        self.errors = []
+
+    @property
+    def duration(self):
+        return self.frames / self.fps
+
+    def __iter__(self):
+        for index, (filename, read) in enumerate(self.uploads):
+            self.frames += 1
+            try:
+                frame = cv2.imdecode(np.frombuffer(read(), np.uint8), cv2.IMREAD_COLOR)
+            except Exception as e:
+                frame, error = None, str(e)
+            else:
+                error = "cannot decode image"
+            if frame is None:
+                self.errors.append({"index": index, "filename": filename, "error": error})
+                continue
+            self.sampled += 1
+            yield index, index / self.fps, frame
+
+    def close(self):
+        pass
+
+
+class ScreenSegmenter:
+    """Groups frames into segments of one unchanged screen, and segments into distinct screens.
+
+    A frame extends the open segment while it stays close to the segment's
+    first frame: dHash within ``hash_bits`` bits and at most ``max_changed`` of
+    the thumbnail pixels changed (a moving cursor or caret stays below it, a
+    scroll or navigation does not). Each segment keeps one keyframe, the frame
+    that moved least since the previous frame, so screens are analyzed once
+    rendered rather than mid-transition. Segments shorter than
+    ``min_duration`` seconds are transitions and get no screen. Segments whose
+    keyframes match (same test) share a screen, so a revisited screen is
+    analyzed once; at most ``max_screens`` screens are kept.
+    """
+
+    def __init__(self, hash_bits=10, max_changed=0.01, min_duration=0.0, max_screens=60):
+        self.hash_bits = hash_bits
+        self.max_changed = max_changed
+        self.min_duration = min_duration
+        self.max_screens = max_screens
+        self.segments = []
+        self.screens = []
+        self._open = None
+        self._previous = None
+
+    def _same(self, a, b):
+        return (a[0] ^ b[0]).bit_count() <= self.hash_bits and changed_fraction(a[1], b[1]) <= self.max_changed
+
+    def add(self, index, seconds, frame):
+        signature = frame_signature(frame)
+        motion = changed_fraction(self._previous, signature[1]) if self._previous is not None else 0.0
+        self._previous = signature[1]
+        segment = self._open
+        if segment is None or not self._same(segment["anchor"], signature):
+            self._close(seconds)
+            segment = self._open = {"start": seconds, "start_frame": index, "frames": 0,
+                                    "anchor": signature, "motion": math.inf}
+        segment["frames"] += 1
+        segment["end_frame"] = index
+        # ties go to the later frame: the screen has settled longer
+        if motion <= segment["motion"]:
+            segment.update(motion=motion, key=frame, key_frame=index, key_time=seconds, key_signature=signature)
+
+    def _close(self, end):
+        segment, self._open = self._open, None
+        if segment is None:
+            return
+        key = segment.pop("key")
+        segment.pop("anchor")
+        segment["end"] = end
+        segment["screen"] = None
+        segment["transition"] = end - segment["start"] < self.min_duration
+        if not segment["transition"]:
+            segment["screen"] = self._match_screen(segment, key)
+        self.segments.append(segment)
+
+    def _match_screen(self, segment, key):
+        for number, screen in enumerate(self.screens):
+            if self._same(screen["signature"], segment["key_signature"]):
+                return number
+        if len(self.screens) >= self.max_screens:
+            return None
+        self.screens.append({
+            "signature": segment["key_signature"],
+            "keyframe": cv2.imencode(".png", key)[1].tobytes(),
+            "key_frame": segment["key_frame"],
+            "key_time": segment["key_time"],
+        })
+        return len(self.screens) - 1
+
+    def finish(self, end):
+        """Close the last segment at ``end`` seconds; returns ``(segments, screens)``."""
+        self._close(end)
+        return self.segments, self.screens
+
+
+def analyze_recording(source, segmenter, pipeline_service, result_cache, settings=None):
+    """Segment a recording, analyze one keyframe per distinct screen in parallel and build the timeline."""
+    for index, seconds, frame in source:
+        segmenter.add(index, seconds, frame)
+    segments, screens = segmenter.finish(source.duration)
+
+    uploads = [(f"screen_{number:03d}.png", (lambda data=screen["keyframe"]: data))
+               for number, screen in enumerate(screens)]
+    results = {}
+    for result in run_batch(uploads, pipeline_service, result_cache, settings):
+        results[result.pop("index")] = result
+
+    timeline = [{
+        "start": round(s["start"], 3),
+        "end": round(s["end"], 3),
+        "start_frame": s["start_frame"],
+        "end_frame": s["end_frame"],
+        "frames": s["frames"],
+        "screen": s["screen"],
+        "transition": s["transition"],
+    } for s in segments]
+
+    screen_list = []
+    for number, screen in enumerate(screens):
+        visits = [s for s in segments if s["screen"] == number]
+        screen_list.append({
+            "screen": number,
+            "keyframe": {"frame": screen["key_frame"], "time": round(screen["key_time"], 3)},
+            "first_seen": round(visits[0]["start"], 3),
+            "visits": len(visits),
+            "time_on_screen": round(sum(s["end"] - s["start"] for s in visits), 3),
+            "result": results.get(number),
+        })
+
+    scores = [r["overall_score"] for r in results.values() if r.get("overall_score") is not None]
+    return {
+        "source": {
+            "type": source.kind,
+            "filename": source.filename,
+            "fps": round(source.fps, 3),
+            "frames": source.frames,
+            "sampled": source.sampled,
+            "duration": round(source.duration, 3),
+            "errors": source.errors,
+        },
+        "screens": screen_list,
+        "timeline": timeline,
+        "summary": {
+            "distinct_screens": len(screens),
+            "segments": len(segments),
+            "transitions": sum(1 for s in segments if s["transition"]),
+            "unassigned": sum(1 for s in segments if not s["transition"] and s["screen"] is None),
+            "analyses": len(screens),
+            "min_score": min(scores) if scores else None,
+            "mean_score": round(sum(scores) / len(scores), 1) if scores else None,
+        },
+    }
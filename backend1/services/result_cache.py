@@ -0,0 +1,160 @@
+# backend/services/result_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Bump whenever analyzer output changes so stale cached results are not served.
+ANALYZER_VERSION = "5"
+
+
+def image_digest(image_data):
+    """Stable SHA-256 hex digest of the uploaded bytes."""
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def make_cache_key(digest, settings=None):
+    """Combine the image digest with analyzer settings and version into one key."""
+    payload = json.dumps({"v": ANALYZER_VERSION, "settings": settings or {}}, sort_keys=True)
+    return hashlib.sha256(f"{digest}:{payload}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed analysis cache: bounded in-memory LRU plus optional SQLite tier.
+
+    The SQLite file survives restarts and can be shared by several worker processes.
+    Its ``table`` keeps at most ``max_disk_entries`` rows (0 = unbounded) and
+    ignores rows older than ``ttl`` seconds (0 = never expire); the oldest rows
+    are pruned every ``PRUNE_EVERY`` writes.
+    """
+
+    PRUNE_EVERY = 32
+
+    def __init__(self, max_entries=256, db_path=None, table="results", max_disk_entries=10000, ttl=0):
+        self.max_entries = max(0, int(max_entries))
+        self.db_path = db_path
+        self.table = table
+        self.max_disk_entries = max(0, int(max_disk_entries))
+        self.ttl = max(0, float(ttl))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_created ON {self.table} (created_at)")
+                self._prune(conn)
+        print("ResultCache initialized")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5.0)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return self._memory[key]
+
+        value = None
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        f"SELECT value FROM {self.table} WHERE key = ? AND created_at >= ?", (key, self._cutoff())
+                    ).fetchone()
+                if row:
+                    value = json.loads(row[0])
+            except sqlite3.Error as e:
+                print("Result cache read error:", e)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def __contains__(self, key):
+        """Whether ``key`` is stored, without loading its value or counting a hit/miss."""
+        with self._lock:
+            if key in self._memory:
+                return True
+        if not self.db_path:
+            return False
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT 1 FROM {self.table} WHERE key = ? AND created_at >= ?", (key, self._cutoff())
+                ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            print("Result cache read error:", e)
+            return False
+
+    def set(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), time.time()),
+                    )
+                    with self._lock:
+                        self._writes += 1
+                        prune = self._writes % self.PRUNE_EVERY == 0
+                    if prune:
+                        self._prune(conn)
+            except sqlite3.Error as e:
+                print("Result cache write error:", e)
+
+    def _cutoff(self):
+        return time.time() - self.ttl if self.ttl else 0.0
+
+    def _prune(self, conn):
+        # expired rows first, then the oldest rows beyond the cap
+        if self.ttl:
+            conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (self._cutoff(),))
+        if self.max_disk_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+                "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+
+    def _remember(self, key, value):
+        if self.max_entries == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.db_path),
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
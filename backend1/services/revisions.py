@@ -0,0 +1,73 @@
+# backend/services/revisions.py
+import hashlib
+
+import numpy as np
+
+# Metrics compared between two revisions of a screenshot
+DELTA_METRICS = (
+    ("overall_score", lambda r: r.get("overall_score")),
+    ("cta_prominence", lambda r: r["detailed_scores"].get("cta_prominence")),
+    ("visual_hierarchy", lambda r: r["detailed_scores"].get("visual_hierarchy")),
+    ("accessibility", lambda r: r["detailed_scores"].get("accessibility")),
+    ("color_contrast", lambda r: r["detailed_scores"].get("color_contrast")),
+    ("buttons", lambda r: r["elements_detected"].get("buttons")),
+    ("text_blocks", lambda r: r["elements_detected"].get("text_blocks")),
+    ("images", lambda r: r["elements_detected"].get("images")),
+)
+
+
+def block_hashes(image, block=32):
+    """Hash the image in ``block``x``block`` tiles; returns rows of hex digests (JSON-friendly).
+
+    Edge tiles are zero-padded, so a page that only grows or shrinks changes
+    its last row of tiles and everything below.
+    """
+    height, width = image.shape[:2]
+    rows, cols = -(-height // block), -(-width // block)
+    padded = np.zeros((rows * block, cols * block) + image.shape[2:], dtype=image.dtype)
+    padded[:height, :width] = image
+    # one copy that lays every tile out contiguously, then one digest per tile
+    tiles = padded.reshape(rows, block, cols, block, -1).swapaxes(1, 2).reshape(rows * cols, -1)
+    tiles = np.ascontiguousarray(tiles)
+    digests = [hashlib.blake2b(tile, digest_size=8).hexdigest() for tile in tiles]
+    return [digests[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def changed_blocks(previous_hashes, hashes):
+    """Boolean (rows, cols) mask of tiles that differ; rows missing from ``previous_hashes`` count as changed."""
+    current = np.array(hashes)
+    changed = np.ones(current.shape, dtype=bool)
+    common = min(len(previous_hashes), len(hashes))
+    if common:
+        changed[:common] = np.array(previous_hashes[:common]) != current[:common]
+    return changed
+
+
+def dirty_bands(changed, block, height, margin):
+    """Merge the rows of changed tiles into full-width (start, end) bands padded by ``margin``.
+
+    Bands closer than the padding are merged, so no two bands overlap.
+    """
+    bands = []
+    for r in np.flatnonzero(changed.any(axis=1)):
+        start = max(0, int(r) * block - margin)
+        end = min(height, (int(r) + 1) * block + margin)
+        if bands and start <= bands[-1][1]:
+            bands[-1] = (bands[-1][0], end)
+        else:
+            bands.append((start, end))
+    return bands
+
+
+def metric_deltas(previous, current):
+    """Per-metric ``{"previous", "current", "delta"}`` between two analysis responses."""
+    deltas = {}
+    for name, read in DELTA_METRICS:
+        try:
+            before, after = read(previous), read(current)
+        except (KeyError, TypeError):
+            continue
+        if before is None or after is None:
+            continue
+        deltas[name] = {"previous": before, "current": after, "delta": round(after - before, 2)}
+    return deltas
@@ -0,0 +1,152 @@
+# backend/services/tracing.py
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Latency buckets (seconds) shared by all histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NOOP = nullcontext()
+
+
+class Tracer:
+    """Records wall and CPU time per pipeline stage; a disabled tracer costs one attribute check."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = []
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.records.append({
+                "stage": name,
+                "wall_ms": round((time.perf_counter() - wall0) * 1000, 3),
+                "cpu_ms": round((time.thread_time() - cpu0) * 1000, 3),
+            })
+
+    def set_image(self, image):
+        """Attach the analyzed image's dimensions to every stage record."""
+        if image is None:
+            return
+        height, width = image.shape[:2]
+        self.set_size(width, height)
+
+    def set_size(self, width, height):
+        for record in self.records:
+            record.setdefault("width", int(width))
+            record.setdefault("height", int(height))
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + list(extra or [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    """Minimal Prometheus-style counters, histograms and scrape-time gauges."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = []
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def register_gauges(self, callback):
+        """``callback()`` returns [(name, labels_dict or None, value)]; evaluated on every scrape."""
+        self._gauges.append(callback)
+
+    def record_trace(self, trace):
+        """Feed the stage records of one pipeline run into the stage histograms and event counters."""
+        for record in (trace or {}).get("stages", []):
+            self.observe("ux_stage_duration_seconds", record["wall_ms"] / 1000, stage=record["stage"])
+            self.inc("ux_stage_cpu_seconds_total", record["cpu_ms"] / 1000, stage=record["stage"])
+        for name, value in (trace or {}).get("counters", {}).items():
+            self.inc(f"ux_{name}_total", value)
+
+    def render(self):
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name in typed:
+                return
+            typed.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, dict(v, buckets=list(v["buckets"]))) for k, v in self._histograms.items())
+
+        for (name, key), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(key)} {value}")
+        for (name, key), hist in histograms:
+            header(name, "histogram")
+            for bound, count in zip(self.buckets, hist["buckets"]):
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(key)} {hist['sum']}")
+            lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+        for callback in self._gauges:
+            try:
+                values = callback()
+            except Exception as e:
+                print("Metrics gauge error:", e)
+                continue
+            for name, labels, value in sorted(values, key=lambda v: (v[0], _label_key(v[1]))):
+                header(name, "gauge")
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry scraped by /api/metrics
+metrics = MetricsRegistry()
+metrics.describe("ux_stage_duration_seconds", "Wall time per analysis stage")
+metrics.describe("ux_stage_cpu_seconds_total", "CPU time spent per analysis stage")
+metrics.describe("ux_request_duration_seconds", "HTTP request latency per endpoint")
+metrics.describe("ux_requests_total", "HTTP requests per endpoint and status")
+metrics.describe("ux_ocr_tile_exact_hits_total", "OCR tiles answered from the tile cache by pixel hash")
+metrics.describe("ux_ocr_tile_perceptual_hits_total", "OCR tiles answered from the tile cache by dHash")
+metrics.describe("ux_ocr_tile_misses_total", "OCR tiles sent to the OCR backend")
+metrics.describe("ux_ocr_tile_bytes_saved_total", "Tile pixel bytes that skipped OCR thanks to the tile cache")
+metrics.describe("ux_ocr_skipped_total", "Analyses whose OCR was skipped by the text gate")
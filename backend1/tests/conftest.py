@@ -0,0 +1,9 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Tests run without Tesseract (the stub backend stands in) and analyze inline
+os.environ.setdefault("UX_OCR_BACKEND", "stub")
+os.environ.setdefault("UX_WORKERS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+# backend/tests/test_app_revisions.py
+import io
+
+import pytest
+
+import app as backend
+from benchmarks.synthetic import generate_screenshot
+from services.result_cache import ResultCache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # room for one screenshot's artifacts, so the next analysis evicts them
+    monkeypatch.setattr(backend, "revision_store", ResultCache(max_entries=1))
+    monkeypatch.setattr(backend, "result_cache", ResultCache(max_entries=16))
+    return backend.app.test_client()
+
+
+def _post(client, url, image, **fields):
+    data = {"image": (io.BytesIO(image), "shot.png")}
+    for key, value in fields.items():
+        data[key] = (io.BytesIO(value), "base.png") if isinstance(value, bytes) else value
+    return client.post(url, data=data, content_type="multipart/form-data")
+
+
+def _completed():
+    return backend.pipeline_service.stats()["completed"]
+
+
+@pytest.fixture(scope="module")
+def images():
+    return {name: generate_screenshot(seed=seed, buttons=buttons)[0]
+            for name, seed, buttons in (("base", 1, 4), ("other", 2, 4), ("revised", 1, 5))}
+
+
+def test_cache_hits_never_run_the_pipeline(client, images):
+    _post(client, "/api/analyze", images["base"])
+    _post(client, "/api/analyze", images["other"])  # evicts the base's artifacts
+    before = _completed()
+    response = _post(client, "/api/analyze", images["base"])
+    assert response.headers["X-Cache"] == "HIT"
+    assert _completed() == before
+
+
+def test_revision_with_evicted_base(client, images):
+    base_id = _post(client, "/api/analyze", images["base"]).get_json()["screenshot_id"]
+    _post(client, "/api/analyze", images["other"])
+
+    full = _post(client, "/api/analyze/revision", images["revised"], previous_id=base_id).get_json()
+    assert full["revision"] == {"previous_id": base_id, "mode": "full", "reason": "previous_unavailable", "bands": []}
+    assert "deltas" not in full
+
+    _post(client, "/api/analyze", images["other"])
+    rebuilt = _post(client, "/api/analyze/revision", images["revised"], previous_id=base_id,
+                    previous_image=images["base"]).get_json()
+    assert rebuilt["revision"]["mode"] == "incremental"
+    assert rebuilt["deltas"]["overall_score"]["previous"] is not None
+
+    wrong = _post(client, "/api/analyze/revision", images["revised"], previous_id=base_id,
+                  previous_image=images["other"])
+    assert wrong.status_code == 400
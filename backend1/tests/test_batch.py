@@ -0,0 +1,33 @@
+# backend/tests/test_batch.py
+import io
+import zipfile
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from services.batch import collect_uploads
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return FileStorage(io.BytesIO(buffer.getvalue()), filename="shots.zip")
+
+
+def test_members_expanding_past_the_cap_are_not_read():
+    bomb = b"\0" * (8 * 1024 * 1024)  # compresses to a few KB
+    uploads = collect_uploads([_archive([("bomb.png", bomb), ("ok.png", b"png")])], max_member_bytes=1024 * 1024)
+    assert [name for name, _ in uploads] == ["bomb.png", "ok.png"]
+    with pytest.raises(ValueError, match="limit"):
+        uploads[0][1]()
+    assert uploads[1][1]() == b"png"
+
+
+def test_archive_images_past_the_cap_are_skipped():
+    members = [(f"shot_{i}.png", b"png") for i in range(5)] + [("notes.txt", b"x")]
+    uploads = collect_uploads([_archive(members), _archive(members)], max_images=3)
+    assert [name for name, _ in uploads] == ["shot_0.png", "shot_1.png", "shot_2.png", "shots.zip", "shots.zip"]
+    with pytest.raises(ValueError, match="more than 3 images"):
+        uploads[3][1]()
@@ -0,0 +1,93 @@
+# backend/tests/test_history.py
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.synthetic import analysis_result
+from services.history import ISSUE_TYPES, SCORES, HistoryStore
+
+DAY = 86400
+START = 1_700_000_000
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+@pytest.fixture
+def recorded(store):
+    """(project, created_at, result) for 400 analyses over 70 days in three projects."""
+    rng = random.Random(0)
+    rows = []
+    for n in range(400):
+        project, created_at = rng.choice(("shop", "blog", "")), START + rng.randrange(70 * DAY)
+        result = analysis_result(rng, n)
+        store.record([result], project, created_at=created_at)
+        rows.append((project, created_at, result))
+    return rows
+
+
+def _period(created_at, bucket):
+    day = datetime.fromtimestamp(created_at, timezone.utc).date()
+    if bucket == "week":
+        day -= timedelta(days=day.weekday())
+    elif bucket == "month":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_rollups_match_raw_rows(store, recorded, bucket):
+    groups = defaultdict(list)
+    for project, created_at, result in recorded:
+        groups[(project, _period(created_at, bucket))].append(result)
+    rollups = store.rollups(bucket)
+    assert [(r["project"], r["period"]) for r in rollups] == sorted(groups)
+    for row in rollups:
+        results = groups[(row["project"], row["period"])]
+        overall = [r["overall_score"] for r in results]
+        assert row["count"] == len(results)
+        assert row["min_overall"] == min(overall) and row["max_overall"] == max(overall)
+        assert row["avg"]["overall_score"] == round(sum(overall) / len(results), 3)
+        for score in SCORES:
+            assert row["avg"][score] == pytest.approx(
+                sum(r["detailed_scores"][score] for r in results) / len(results), abs=1e-3)
+        assert row["no_cta"] == sum(1 for r in results if r["elements_detected"]["cta_buttons"] == 0)
+        assert row["issues"] == {t: sum(1 for r in results if any(i["type"] == t for i in r["issues"]))
+                                 for t in ISSUE_TYPES}
+
+
+def test_rollups_filter_by_project_and_time(store, recorded):
+    # rollups hold whole UTC days
+    first = START // DAY + 10
+    since, until = first * DAY, (first + 30) * DAY
+    expected = [r for p, t, r in recorded if p == "shop" and first <= t // DAY < first + 30]
+    rollups = store.rollups("day", project="shop", since=since, until=until)
+    assert sum(r["count"] for r in rollups) == len(expected)
+
+
+def test_pages_cover_every_match_once_newest_first(store, recorded):
+    seen, cursor = [], None
+    while True:
+        page = store.query(limit=7, cursor=cursor, project="blog", no_cta=True)
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    expected = [r for p, t, r in recorded if p == "blog" and r["elements_detected"]["cta_buttons"] == 0]
+    assert sorted(i["screenshot_id"] for i in seen) == sorted(r["screenshot_id"] for r in expected)
+    keys = [(i["created_at"], i["id"]) for i in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_issue_filter_and_failed_items(store):
+    ok = analysis_result(random.Random(1), 1)
+    ok["issues"] = [{"type": "contrast", "reason": "low_contrast"}]
+    assert store.record([ok, {"filename": "bad.png", "error": "cannot decode"}], "shop") == 1
+    assert len(store.query(issue="contrast")["items"]) == 1
+    assert store.query(issue="accessibility")["items"] == []
+    with pytest.raises(ValueError):
+        store.query(issue="nope")
@@ -0,0 +1,10 @@
+# backend/tests/test_memory_ceiling.py
+from benchmarks.check_memory_ceiling import measure
+
+# Same allowance as `python -m benchmarks.check_memory_ceiling`: the decoded bitmap plus a fixed working set
+BUDGET_MB = 350
+
+
+def test_band_mode_memory_stays_flat():
+    rise, bitmap_mb = measure(16000)
+    assert rise <= bitmap_mb + BUDGET_MB
@@ -0,0 +1,47 @@
+# backend/tests/test_ocr_backends.py
+import numpy as np
+import pytesseract
+import pytest
+
+from analyzers.ocr_backends import OCR_BACKENDS, StubBackend
+from analyzers.text_extractor import TextExtractor
+from benchmarks.reference import check_text_elements
+from benchmarks.synthetic import PHRASES, text_page
+
+
+def _extractor(name, **kwargs):
+    """A TextExtractor on backend ``name``; skips when the backend or tesseract is missing."""
+    try:
+        extractor = TextExtractor(ocr_backend=name, **kwargs)
+        if name != StubBackend.name:
+            pytesseract.get_tesseract_version()
+    except Exception as e:
+        pytest.skip(f"{name} unavailable: {e}")
+    return extractor
+
+
+@pytest.mark.parametrize("name", sorted(OCR_BACKENDS))
+def test_text_elements_contract(name):
+    image = text_page()
+    elements = _extractor(name, tiled_min_height=0).extract_text(image)
+    assert elements
+    assert check_text_elements(name, elements, image.shape) == []
+
+
+@pytest.mark.parametrize("name", sorted(OCR_BACKENDS))
+def test_tiled_ocr_keeps_each_word_once(name):
+    page = text_page()
+    whole = _extractor(name, tiled_min_height=0).extract_text(page)
+    tall = np.vstack([page] * 4)
+    tiled = _extractor(name, tiled_min_height=2000).extract_text(tall)
+    assert check_text_elements(name, tiled, tall.shape) == []
+    assert len(tiled) == 4 * len(whole)
+    assert max(el["y"] for el in tiled) > 3 * page.shape[0]
+
+
+@pytest.mark.parametrize("name", sorted(set(OCR_BACKENDS) - {StubBackend.name}))
+def test_recall(name):
+    expected = {w.lower() for p in PHRASES for w in p.split() if len(w) > 1}
+    elements = _extractor(name, tiled_min_height=0).extract_text(text_page())
+    found = {el["text"].lower() for el in elements}
+    assert len(found & expected) / len(expected) >= 0.8
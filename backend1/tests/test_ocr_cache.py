@@ -0,0 +1,102 @@
+# backend/tests/test_ocr_cache.py
+import cv2
+import numpy as np
+
+from analyzers.ocr_cache import OCRTileCache, same_content
+
+
+def _button(label, size=(48, 220)):
+    """A single-channel button tile: white label on a dark fill, as the binarized page has it."""
+    tile = np.zeros(size, np.uint8)
+    cv2.putText(tile, label, (16, 32), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+    return tile
+
+
+def _words(text):
+    return [{"text": text, "x": 16, "y": 12, "width": 120, "height": 24, "confidence": 90}]
+
+
+def _store(cache, tile, text):
+    words, kind, keys = cache.get(tile)
+    assert kind is None
+    cache.set(tile, keys, _words(text))
+
+
+def test_exact_hit_returns_cached_words():
+    cache = OCRTileCache(tolerance=0)
+    tile = _button("Sign up")
+    _store(cache, tile, "Sign up")
+    words, kind, _ = cache.get(tile.copy())
+    assert kind == "exact"
+    assert words[0]["text"] == "Sign up"
+    assert cache.stats()["bytes_saved"] == tile.nbytes
+
+
+def test_byte_cap_evicts_least_recently_used():
+    # without perceptual matching each entry costs exactly its words' footprint
+    cache = OCRTileCache(max_bytes=700, tolerance=0)
+    first, second, third = _button("Home"), _button("About"), _button("Pricing")
+    _store(cache, first, "Home")
+    _store(cache, second, "About")
+    assert cache.stats()["entries"] == 2
+    assert cache.get(first)[1] == "exact"  # now the most recently used
+
+    _store(cache, third, "Pricing")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert cache.get(second)[1] is None
+    assert cache.get(first)[1] == "exact"
+    assert cache.get(third)[1] == "exact"
+
+
+def test_entry_larger_than_the_cap_is_not_stored():
+    cache = OCRTileCache(max_bytes=200, tolerance=0)
+    tile = _button("Contact")
+    _store(cache, tile, "Contact")
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_perceptual_hit_survives_edge_noise():
+    cache = OCRTileCache(tolerance=8)
+    tile = _button("Download")
+    _store(cache, tile, "Download")
+    noisy = tile.copy()
+    ys, xs = np.nonzero(cv2.Canny(tile, 100, 200))
+    for y, x in list(zip(ys, xs))[::25]:
+        noisy[y, x] = 255 - noisy[y, x]
+    assert not np.array_equal(noisy, tile)
+    words, kind, _ = cache.get(noisy)
+    assert kind == "perceptual"
+    assert words[0]["text"] == "Download"
+
+
+def test_different_label_is_rejected_even_within_dhash_tolerance():
+    download, try_free = _button("Download"), _button("Try free")
+    assert not same_content(try_free, np.packbits(download > 127))
+    assert same_content(download, np.packbits(download > 127))
+
+    # a tolerance of every dHash bit makes every same-shape tile a candidate
+    cache = OCRTileCache(tolerance=256)
+    _store(cache, download, "Download")
+    words, kind, _ = cache.get(try_free)
+    assert kind is None and words is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_perceptual_candidates_are_bucketed_by_shape():
+    cache = OCRTileCache(max_bytes=4096, tolerance=256)
+    narrow = _button("Buy now", size=(48, 220))
+    wide = _button("Buy now", size=(48, 240))
+    _store(cache, narrow, "Buy now")
+    # identical label and dHash range, but a different tile shape is never compared
+    assert cache.get(wide)[1] is None
+    cache.set(wide, cache.get(wide)[2], _words("Buy now"))
+    assert set(cache._by_shape) == {(48, 220), (48, 240)}
+
+    # evicting the last tile of a shape drops its bucket
+    while cache.stats()["entries"] > 1:
+        cache._evict()
+    assert set(cache._by_shape) == {(48, 240)}
+    assert cache.get(wide)[1] == "exact"
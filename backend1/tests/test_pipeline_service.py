@@ -0,0 +1,21 @@
+# backend/tests/test_pipeline_service.py
+import pytest
+
+from benchmarks.synthetic import generate_screenshot
+from services.pipeline import AnalysisPipeline, PipelineService
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_progress_and_partial_are_relayed_before_the_result(workers):
+    service = PipelineService(workers=workers, queue_size=0)
+    events, partials = [], []
+    try:
+        data, _ = generate_screenshot(width=1200, height=1600, seed=5)
+        future = service.submit(data, "relay", block=True, progress=lambda *e: events.append(e),
+                                partial=partials.append)
+        result = future.result(timeout=120)
+    finally:
+        service.shutdown()
+    assert result["screenshot_id"] == "relay"
+    assert [stage for stage, status in events if status == "finished"] == list(AnalysisPipeline.STAGES)
+    assert len(partials) == 1 and partials[0]["partial"]
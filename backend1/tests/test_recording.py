@@ -0,0 +1,91 @@
+# backend/tests/test_recording.py
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_screenshot
+from services.pipeline import PipelineService
+from services.recording import ImageSequence, ScreenSegmenter, analyze_recording
+from services.result_cache import ResultCache
+
+
+def _page(seed):
+    data, _ = generate_screenshot(width=640, height=400, buttons=3, seed=seed, site_seed=0)
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _png(frame):
+    return cv2.imencode(".png", frame)[1].tobytes()
+
+
+@pytest.fixture(scope="module")
+def flow():
+    """One frame per second: A, A with a cursor, a fade to B, B, B, A again, a broken frame, C, C."""
+    a, b, c = _page(1), _page(2), _page(3)
+    cursor = a.copy()
+    cv2.circle(cursor, (320, 200), 7, (20, 20, 20), -1)
+    frames = [_png(a), _png(cursor), _png(cv2.addWeighted(a, 0.5, b, 0.5, 0)), _png(b), _png(b),
+              _png(a), _png(a), b"not an image", _png(c), _png(c)]
+    return [(f"frame_{i:02d}.png", (lambda data=data: data)) for i, data in enumerate(frames)]
+
+
+def _segment(uploads, **kwargs):
+    source = ImageSequence(uploads, fps=1.0)
+    segmenter = ScreenSegmenter(**kwargs)
+    for index, seconds, frame in source:
+        segmenter.add(index, seconds, frame)
+    segments, screens = segmenter.finish(source.duration)
+    return source, segments, screens
+
+
+def _spans(segments):
+    return [(s["start_frame"], s["end_frame"], s["screen"], s["transition"]) for s in segments]
+
+
+def test_frames_group_into_segments_and_revisits_share_a_screen(flow):
+    source, segments, screens = _segment(flow, min_duration=1.5)
+    assert source.frames == 10 and source.sampled == 9
+    assert [e["index"] for e in source.errors] == [7]
+    assert _spans(segments) == [
+        (0, 1, 0, False),   # A, the cursor stays within the segment
+        (2, 2, None, True),  # the cross-fade is too short to be a screen
+        (3, 4, 1, False),   # B
+        (5, 6, 0, False),   # A revisited: same screen, not analyzed again
+        (8, 9, 2, False),   # C, after the undecodable frame
+    ]
+    assert [(s["start"], s["end"]) for s in segments] == [(0, 2), (2, 3), (3, 5), (5, 8), (8, 10)]
+    assert len(screens) == 3
+    # keyframes are the stillest frames: not the one with the cursor moved, nor the first after a fade
+    assert [screen["key_frame"] for screen in screens] == [0, 4, 9]
+
+
+def test_without_min_duration_the_fade_is_its_own_screen(flow):
+    _, segments, screens = _segment(flow)
+    assert not any(s["transition"] for s in segments)
+    assert [s["screen"] for s in segments] == [0, 1, 2, 0, 3]
+    assert len(screens) == 4
+
+
+def test_screens_past_max_screens_stay_unassigned(flow):
+    _, segments, screens = _segment(flow, min_duration=1.5, max_screens=2)
+    assert len(screens) == 2
+    # the revisit still matches a kept screen; the new screen C does not get one
+    assert [s["screen"] for s in segments] == [0, None, 1, 0, None]
+
+
+def test_timeline_counts_transitions_and_unassigned_segments(flow):
+    service = PipelineService(workers=0, queue_size=0)
+    try:
+        report = analyze_recording(ImageSequence(flow, fps=1.0), ScreenSegmenter(min_duration=1.5, max_screens=2),
+                                   service, ResultCache(max_entries=8))
+    finally:
+        service.shutdown()
+    summary = report["summary"]
+    assert summary["segments"] == 5
+    assert summary["transitions"] == 1
+    assert summary["unassigned"] == 1
+    assert summary["distinct_screens"] == summary["analyses"] == 2
+    first = report["screens"][0]
+    assert first["visits"] == 2
+    assert first["time_on_screen"] == 5.0
+    assert first["result"]["overall_score"] is not None
@@ -0,0 +1,31 @@
+# backend/tests/test_result_cache.py
+import sqlite3
+import time
+
+from services.result_cache import ResultCache
+
+
+def _rows(path, table="results"):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_disk_tier_keeps_the_newest_rows(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(max_entries=0, db_path=path, max_disk_entries=10)
+    for i in range(5 * ResultCache.PRUNE_EVERY):
+        cache.set(f"k{i}", {"i": i})
+    assert _rows(path) <= 10 + ResultCache.PRUNE_EVERY
+    assert cache.get(f"k{5 * ResultCache.PRUNE_EVERY - 1}") == {"i": 5 * ResultCache.PRUNE_EVERY - 1}
+    assert cache.get("k0") is None
+    # the cap also applies when a store is opened
+    ResultCache(max_entries=0, db_path=path, max_disk_entries=3)
+    assert _rows(path) == 3
+
+
+def test_expired_rows_are_not_served(tmp_path):
+    cache = ResultCache(max_entries=0, db_path=str(tmp_path / "cache.db"), table="revisions", ttl=0.2)
+    cache.set("a", [1])
+    assert cache.get("a") == [1] and "a" in cache
+    time.sleep(0.3)
+    assert cache.get("a") is None and "a" not in cache
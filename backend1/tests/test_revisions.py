@@ -0,0 +1,74 @@
+# backend/tests/test_revisions.py
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_screenshot
+from services.pipeline import AnalysisPipeline
+
+
+def _decode(data):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _encode(image):
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return AnalysisPipeline()
+
+
+@pytest.fixture(scope="module")
+def base(pipeline):
+    """A 1200x3000 page and the artifacts of its analysis."""
+    data, _ = generate_screenshot(width=1200, height=3000, text_density=0.8, buttons=18, seed=3)
+    artifacts = {}
+    pipeline.analyze(data, "v1", artifacts=artifacts)
+    return _decode(data), artifacts
+
+
+def _with_cta(image):
+    image = image.copy()
+    cv2.rectangle(image, (600, 1500), (820, 1540), (40, 60, 220), -1)
+    cv2.putText(image, "New CTA", (620, 1530), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return image
+
+
+def _words(artifacts):
+    return sorted((e["x"], e["y"], e["width"], e["height"]) for e in artifacts["text_elements"])
+
+
+@pytest.mark.parametrize("edit", [_with_cta, lambda image: image[:2000], lambda image: image])
+def test_incremental_revision_matches_full_analysis(pipeline, base, edit):
+    image, previous = base
+    data = _encode(edit(image))
+    incremental, full = {}, {}
+    revised = pipeline.analyze(data, "v2", artifacts=incremental, previous=previous)
+    reference = pipeline.analyze(data, "v2", artifacts=full)
+    assert revised["revision"]["mode"] == "incremental"
+    assert revised["elements_detected"] == reference["elements_detected"]
+    assert revised["detailed_scores"] == reference["detailed_scores"]
+    assert _words(incremental) == _words(full)
+    assert sorted(map(tuple, incremental["candidates"])) == sorted(map(tuple, full["candidates"]))
+
+
+def test_shorter_revision_keeps_nothing_below_its_bottom(pipeline, base):
+    image, previous = base
+    artifacts = {}
+    pipeline.analyze(_encode(image[:2000]), "v2", artifacts=artifacts, previous=previous)
+    assert all(e["y"] + e["height"] // 2 < 2000 for e in artifacts["text_elements"])
+    assert all(c[1] + c[3] // 2 < 2000 for c in artifacts["candidates"])
+
+
+@pytest.mark.parametrize("edit, settings, reason", [
+    (lambda image: image, {"tier": "fast"}, "tier_changed"),
+    (lambda image: image[:, :1000], None, "size_changed"),
+    (lambda image: 255 - image, None, "large_change"),
+])
+def test_revision_falls_back_to_full_analysis(pipeline, base, edit, settings, reason):
+    image, previous = base
+    revised = pipeline.analyze(_encode(edit(image)), "v2", settings, previous=previous)
+    assert revised["revision"]["mode"] == "full"
+    assert revised["revision"]["reason"] == reason
@@ -0,0 +1,36 @@
+# backend/tests/test_spatial.py
+import numpy as np
+import pytest
+
+from analyzers.button_detector import ButtonDetector
+from analyzers.spatial import PointGrid, greedy_nms, to_box_array
+from benchmarks.reference import find_text_in_region, remove_duplicate_buttons
+from benchmarks.synthetic import random_boxes
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 2000])
+def test_point_grid_matches_brute_force(n):
+    rng = np.random.default_rng(n)
+    xs, ys = rng.integers(0, 1200, n), rng.integers(0, 4000, n)
+    grid = PointGrid(xs, ys)
+    for x0, y0, w, h in rng.integers(0, 1300, (100, 4)):
+        expected = np.flatnonzero((xs >= x0) & (xs <= x0 + w) & (ys >= y0) & (ys <= y0 + h))
+        assert grid.query(x0, y0, x0 + w, y0 + h).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 2000])
+def test_text_matching_matches_list_scan(n):
+    rng = np.random.default_rng(n)
+    texts, regions = random_boxes(n, rng), random_boxes(max(1, n // 10), rng)
+    detector = ButtonDetector()
+    index = detector._build_text_index(texts)
+    for r in regions:
+        expected = find_text_in_region(texts, r["x"], r["y"], r["width"], r["height"])
+        assert detector._find_text_in_region(texts, r["x"], r["y"], r["width"], r["height"], index) == expected
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 2000])
+def test_greedy_nms_matches_list_scan(n):
+    buttons = random_boxes(n, np.random.default_rng(n))
+    keep = greedy_nms(to_box_array(buttons), 10, 5)
+    assert [b for b, k in zip(buttons, keep) if k] == remove_duplicate_buttons(buttons)
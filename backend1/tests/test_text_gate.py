@@ -0,0 +1,54 @@
+# backend/tests/test_text_gate.py
+import cv2
+import numpy as np
+import pytest
+
+from analyzers.context import AnalysisContext
+from services.pipeline import AnalysisPipeline
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return AnalysisPipeline()
+
+
+def _page(labels, size=(900, 1200)):
+    """A white page with (x, y, text, button color or None) labels."""
+    image = np.full(size + (3,), 255, np.uint8)
+    for x, y, text, fill in labels:
+        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+        if fill:
+            cv2.rectangle(image, (x - 20, y - h - 16), (x + w + 20, y + 16), fill, -1)
+        cv2.putText(image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255) if fill else (30, 30, 30), 2)
+    return image
+
+
+def _gate(pipeline, image):
+    data = cv2.imencode(".png", image)[1].tobytes()
+    return pipeline.text_extractor.likely_has_text(AnalysisContext(pipeline.image_processor.preprocess_image(data)))
+
+
+@pytest.mark.parametrize("labels", [
+    [(520, 460, "Buy now", (40, 90, 220))],
+    [(560, 460, "OK", (40, 90, 220))],
+    [(40, 40, "Home", None), (130, 40, "About", None)],
+])
+def test_short_labels_pass_the_gate(pipeline, labels):
+    assert _gate(pipeline, _page(labels))
+
+
+def test_single_cta_page_is_ocrd(pipeline):
+    trace = {}
+    data = cv2.imencode(".png", _page([(520, 460, "Buy now", (40, 90, 220))]))[1].tobytes()
+    result = pipeline.analyze(data, "cta", trace=trace)
+    assert "ocr_skipped" not in trace["counters"]
+    assert result["elements_detected"]["text_blocks"] > 0
+
+
+def test_textless_pages_skip_ocr(pipeline):
+    shapes = _page([])
+    for i in range(6):
+        cv2.rectangle(shapes, (50 + i * 190, 200), (200 + i * 190, 400), (40 * i, 120, 200), -1)
+    gradient = np.tile(np.linspace(0, 255, 1200, dtype=np.uint8), (900, 1))
+    for image in (_page([]), shapes, cv2.merge([gradient, gradient[::-1], gradient])):
+        assert not _gate(pipeline, image)